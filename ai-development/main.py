@@ -10,6 +10,7 @@
     python main.py search "キーワード"
     python main.py index
     python main.py stats
+    python main.py bulk < entries.jsonl
 """
 
 from __future__ import annotations
@@ -18,8 +19,11 @@ import argparse
 import json
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
-from src.content_manager import ContentManager
+if TYPE_CHECKING:
+    # --help や引数エラーでは読み込まないよう、実体の import は main() で行う
+    from src.content_manager import ContentManager
 
 
 def cmd_add_text(manager: ContentManager, args: argparse.Namespace) -> None:
@@ -121,6 +125,90 @@ def cmd_stats(manager: ContentManager, args: argparse.Namespace) -> None:
             print(f"  {cat}: {count}")
 
 
+# bulk で受け付けるキー（ContentManager.add_text / add_image の引数名）
+_BULK_TEXT_KEYS = {"title", "body", "category", "tags", "source"}
+_BULK_IMAGE_KEYS = {"title", "image_path", "description", "category", "tags", "source"}
+_BULK_REQUIRED_KEYS = {"text": ("title", "body"), "image": ("title", "image_path")}
+# 文字列で指定するキー（source は省略扱いの null も許す）
+_BULK_STR_KEYS = ("title", "body", "image_path", "description", "source")
+
+
+def _bulk_record_error(record: dict, categories: list[str]) -> Optional[str]:
+    """bulk の1行（type を除いたもの）を検証し、不正なら理由を返す"""
+    content_type = record.pop("type", "text")
+    if content_type not in _BULK_REQUIRED_KEYS:
+        return f"不明な type {content_type}（text または image）"
+    allowed = _BULK_IMAGE_KEYS if content_type == "image" else _BULK_TEXT_KEYS
+    for key in _BULK_REQUIRED_KEYS[content_type]:
+        if key not in record:
+            return f"{key} がありません"
+    unknown = set(record) - allowed
+    if unknown:
+        return f"不明なキー {', '.join(sorted(unknown))}"
+    for key in _BULK_STR_KEYS:
+        if key not in record or (key == "source" and record[key] is None):
+            continue
+        if not isinstance(record[key], str):
+            return f"{key} は文字列で指定してください"
+    if "category" in record and record["category"] not in categories:
+        return f"不明なカテゴリ {record['category']}"
+    if "tags" in record and not (
+        isinstance(record["tags"], list) and all(isinstance(t, str) for t in record["tags"])
+    ):
+        return "tags は文字列のリストで指定してください"
+    return None
+
+
+def cmd_bulk(manager: ContentManager, args: argparse.Namespace) -> None:
+    """標準入力のJSONL（1行1エントリ）からまとめて追加し、INDEX.md を一度だけ更新する"""
+    texts: list[dict] = []
+    images: list[dict] = []
+    errors: list[str] = []
+    image_handler = None
+
+    # 書き込み前に全行を検証し、不正な行があれば何も追加しない
+    for lineno, line in enumerate(sys.stdin, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            errors.append(f"{lineno}行目: JSONとして読めません ({e})")
+            continue
+        if not isinstance(record, dict):
+            errors.append(f"{lineno}行目: オブジェクトではありません")
+            continue
+
+        is_image = record.get("type", "text") == "image"
+        section = "images" if is_image else "text"
+        error = _bulk_record_error(record, manager.config["content"][section]["categories"])
+        if error is not None:
+            errors.append(f"{lineno}行目: {error}")
+            continue
+        if is_image:
+            # 画像は add_image と同じ規則（存在・拡張子）で事前に確認する
+            if image_handler is None:
+                image_handler = manager.image_handler
+            try:
+                image_handler.check_image_path(record["image_path"])
+            except (FileNotFoundError, ValueError) as e:
+                errors.append(f"{lineno}行目: {e}")
+                continue
+        (images if is_image else texts).append(record)
+
+    if errors:
+        for error in errors:
+            print(error, file=sys.stderr)
+        sys.exit(1)
+
+    manager.batch_add_text(texts)
+    for record in images:
+        manager.add_image(**record)
+    path = manager.update_index()
+    print(f"テキスト {len(texts)} 件・画像 {len(images)} 件を追加しました")
+    print(f"インデックスを更新しました: {path}")
+
+
 def build_parser() -> argparse.ArgumentParser:
     """引数パーサーを構築する"""
     parser = argparse.ArgumentParser(
@@ -177,6 +265,12 @@ def build_parser() -> argparse.ArgumentParser:
     p_stats = subparsers.add_parser("stats", help="統計情報を表示")
     p_stats.set_defaults(func=cmd_stats)
 
+    # bulk
+    p_bulk = subparsers.add_parser(
+        "bulk", help="標準入力のJSONLからまとめて追加（INDEX.md も更新）"
+    )
+    p_bulk.set_defaults(func=cmd_bulk)
+
     return parser
 
 
@@ -189,6 +283,8 @@ def main() -> None:
         parser.print_help()
         sys.exit(1)
 
+    from src.content_manager import ContentManager
+
     base_dir = Path(__file__).resolve().parent
     manager = ContentManager(base_dir)
     args.func(manager, args)
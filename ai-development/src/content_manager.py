@@ -6,15 +6,58 @@
 from __future__ import annotations
 
 import json
+import re
+import time
+from collections import Counter
 from datetime import datetime
+from functools import cached_property
 from pathlib import Path
 from typing import Optional
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # libyaml なしでビルドされた PyYAML
+    from yaml import SafeLoader
+
 from src.text_handler import TextHandler
 from src.image_handler import ImageHandler
 
+_WORD_PATTERN = re.compile(r"\w+")
+
+# この長さを超える本文は小文字化したコピーを索引に保持せず、候補になった時だけファイルを探す
+_LARGE_BODY_THRESHOLD = 64 * 1024
+
+# 一覧・統計・INDEX生成で使うフィールド（本文や説明文は含めない）
+LIST_FIELDS = frozenset({"type", "path", "title", "category", "created_at", "tags"})
+
+
+def _tokenize(text: str) -> set[str]:
+    """検索インデックス用のトークン集合を返す
+
+    日本語は分かち書きされず部分一致で検索されるため、単語ではなく
+    2文字単位（bigram）で索引する。1文字の語はそのまま1トークンとする。
+    """
+    tokens: set[str] = set()
+    for run in _WORD_PATTERN.findall(text.lower()):
+        if len(run) == 1:
+            tokens.add(run)
+        else:
+            tokens.update(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def _searchable_text(entry: dict, include_body: bool = True) -> str:
+    """検索対象となるフィールドを連結して小文字化する"""
+    return " ".join([
+        entry.get("title", ""),
+        entry.get("category", ""),
+        " ".join(entry.get("tags", [])),
+        entry.get("body", "") if include_body else "",
+        entry.get("description", ""),
+    ]).lower()
+
 
 class ContentManager:
     """ナレッジベース全体のコンテンツを管理するクラス"""
@@ -27,8 +70,30 @@ class ContentManager:
         """
         self.base_dir = base_dir or Path(__file__).resolve().parent.parent
         self.config = self._load_config()
-        self.text_handler = TextHandler(self.base_dir, self.config)
-        self.image_handler = ImageHandler(self.base_dir, self.config)
+
+        # 検索用転置インデックス（token → エントリパス）。初回検索時に構築する
+        self._inverted: dict[str, set[str]] = {}
+        # エントリパス → (エントリ, 小文字化済みの検索対象テキスト)
+        self._indexed: dict[str, tuple[dict, str]] = {}
+        # 本文が大きく、検索対象テキストに本文を含めていないエントリのパス
+        self._large_bodies: set[str] = set()
+        self._inv_dirty = True
+
+        # 検索結果キャッシュ（小文字化したクエリ → (保存時刻, 結果)）。索引の再構築時に破棄する
+        search_config = self.config.get("search", {})
+        self._search_cache: dict[str, tuple[float, list[dict]]] = {}
+        self._search_cache_ttl = float(search_config.get("cache_ttl_seconds", 60))
+        self._search_cache_size = int(search_config.get("cache_max_entries", 128))
+
+    @cached_property
+    def text_handler(self) -> TextHandler:
+        """テキストエントリのハンドラ（エントリキャッシュの読み込みを初回利用時まで遅らせる）"""
+        return TextHandler(self.base_dir, self.config)
+
+    @cached_property
+    def image_handler(self) -> ImageHandler:
+        """画像エントリのハンドラ（エントリキャッシュの読み込みを初回利用時まで遅らせる）"""
+        return ImageHandler(self.base_dir, self.config)
 
     def _load_config(self) -> dict:
         """設定ファイルを読み込む"""
@@ -36,7 +101,7 @@ class ContentManager:
         if not config_path.exists():
             raise FileNotFoundError(f"設定ファイルが見つかりません: {config_path}")
         with open(config_path, encoding="utf-8") as f:
-            return yaml.safe_load(f)
+            return yaml.load(f, Loader=SafeLoader)
 
     def add_text(
         self,
@@ -58,13 +123,32 @@ class ContentManager:
         Returns:
             作成されたファイルのパス
         """
-        return self.text_handler.create_entry(
+        path = self.text_handler.create_entry(
             title=title,
             body=body,
             category=category,
             tags=tags,
             source=source,
         )
+        self._inv_dirty = True
+        return path
+
+    def batch_add_text(self, entries: list[dict]) -> list[Path]:
+        """複数のテキストエントリをまとめて追加する
+
+        検索索引の無効化は最後に一度だけ行う。
+
+        Args:
+            entries: add_text の引数（title, body, category, tags, source）をキーに持つ辞書のリスト
+
+        Returns:
+            作成されたファイルのパスのリスト
+        """
+        try:
+            return [self.text_handler.create_entry(**entry) for entry in entries]
+        finally:
+            # 途中で失敗しても、作成済みのエントリは検索対象にする
+            self._inv_dirty = True
 
     def add_image(
         self,
@@ -88,7 +172,7 @@ class ContentManager:
         Returns:
             作成されたメタデータファイルのパス
         """
-        return self.image_handler.register_image(
+        path = self.image_handler.register_image(
             title=title,
             image_path=image_path,
             description=description,
@@ -96,12 +180,15 @@ class ContentManager:
             tags=tags,
             source=source,
         )
+        self._inv_dirty = True
+        return path
 
     def list_entries(
         self,
         content_type: Optional[str] = None,
         category: Optional[str] = None,
         tag: Optional[str] = None,
+        fields: Optional[frozenset[str]] = LIST_FIELDS,
     ) -> list[dict]:
         """エントリ一覧を取得する
 
@@ -109,6 +196,8 @@ class ContentManager:
             content_type: "text" or "images"。Noneの場合は両方。
             category: カテゴリでフィルタ
             tag: タグでフィルタ
+            fields: 返すフィールド名。既定は一覧表示用の LIST_FIELDS（本文は読み込まない）。
+                Noneの場合は全フィールド
 
         Returns:
             エントリ情報のリスト
@@ -116,11 +205,17 @@ class ContentManager:
         entries: list[dict] = []
 
         if content_type is None or content_type == "text":
-            entries.extend(self.text_handler.list_entries(category=category, tag=tag))
+            entries.extend(
+                self.text_handler.list_entries(category=category, tag=tag, fields=fields)
+            )
 
         if content_type is None or content_type == "images":
-            entries.extend(self.image_handler.list_entries(category=category, tag=tag))
+            entries.extend(
+                self.image_handler.list_entries(category=category, tag=tag, fields=fields)
+            )
 
+        # 各ハンドラはファイル名（日付）の降順で返すため、降順の区間が数本あるだけの
+        # 入力になり、Timsort はほぼ線形時間で並べ終える
         entries.sort(key=lambda e: e.get("created_at", ""), reverse=True)
         return entries
 
@@ -133,23 +228,91 @@ class ContentManager:
         Returns:
             マッチしたエントリ情報のリスト
         """
-        results: list[dict] = []
+        if self._inv_dirty:
+            self._rebuild_inverted()
+
         query_lower = query.lower()
+        now = time.monotonic()
+        cached = self._search_cache.get(query_lower)
+        if cached is not None and now - cached[0] < self._search_cache_ttl:
+            return list(cached[1])
+
+        results = self._search_uncached(query_lower)
 
-        for entry in self.list_entries():
-            searchable = " ".join([
-                entry.get("title", ""),
-                entry.get("category", ""),
-                " ".join(entry.get("tags", [])),
-                entry.get("body", ""),
-                entry.get("description", ""),
-            ]).lower()
+        # 上限を超えたら最も古く登録したクエリから捨てる（dict は挿入順を保持）
+        self._search_cache.pop(query_lower, None)
+        if len(self._search_cache) >= self._search_cache_size:
+            del self._search_cache[next(iter(self._search_cache))]
+        self._search_cache[query_lower] = (now, results)
+        return list(results)
 
-            if query_lower in searchable:
+    def _search_uncached(self, query_lower: str) -> list[dict]:
+        """転置インデックスを使って検索する（結果キャッシュを介さない）
+
+        Args:
+            query_lower: 小文字化済みの検索キーワード
+
+        Returns:
+            マッチしたエントリ情報のリスト
+        """
+        # クエリの全トークンを含むエントリだけを候補にし、部分一致で確定する
+        candidates: Optional[set[str]] = None
+        query_tokens = {t for t in _tokenize(query_lower) if len(t) > 1}
+        if query_tokens:
+            postings = [self._inverted.get(t, set()) for t in query_tokens]
+            candidates = set.intersection(*postings)
+            if not candidates:
+                return []
+
+        results: list[dict] = []
+        for path, (entry, searchable) in self._indexed.items():
+            if candidates is not None and path not in candidates:
+                continue
+            if query_lower in searchable or (
+                path in self._large_bodies and self._large_body_contains(entry, query_lower)
+            ):
                 results.append(entry)
 
         return results
 
+    def _large_body_contains(self, entry: dict, query_lower: str) -> bool:
+        """索引に本文を持たないエントリについて、本文に検索語が含まれるかを調べる"""
+        file_path = self.base_dir / entry["path"]
+        # 大文字・小文字の別がある文字が ASCII だけなら、ファイルを直接バイト列で探せる
+        if all(c.isascii() or c == c.upper() for c in query_lower):
+            has_case = query_lower != query_lower.upper()
+            return self.text_handler.find_in_body(
+                file_path, query_lower.encode("utf-8"), ignore_case=has_case
+            )
+        # 全角英字など ASCII 以外の大文字・小文字を含む検索語だけ、本文を読んで小文字化する
+        body = self.text_handler.read_entry(file_path)["body"]
+        return query_lower in body.lower()
+
+    def _rebuild_inverted(self) -> None:
+        """全エントリを読み直して転置インデックスを再構築する"""
+        inverted: dict[str, set[str]] = {}
+        indexed: dict[str, tuple[dict, str]] = {}
+        large_bodies: set[str] = set()
+
+        # 本文を含む連結・小文字化は索引構築時に一度だけ行い、以降のクエリで使い回す
+        for entry in self.list_entries(fields=None):
+            path = entry["path"]
+            searchable = _searchable_text(entry)
+            for token in _tokenize(searchable):
+                inverted.setdefault(token, set()).add(path)
+            if len(entry.get("body", "")) > _LARGE_BODY_THRESHOLD:
+                # 大きな本文は索引に持たず、検索時にファイルを直接探す
+                large_bodies.add(path)
+                searchable = _searchable_text(entry, include_body=False)
+                entry = {k: v for k, v in entry.items() if k != "body"}
+            indexed[path] = (entry, searchable)
+
+        self._inverted = inverted
+        self._indexed = indexed
+        self._large_bodies = large_bodies
+        self._inv_dirty = False
+        self._search_cache.clear()
+
     def update_index(self) -> Path:
         """INDEX.md を再生成する
 
@@ -157,71 +320,51 @@ class ContentManager:
             INDEX.mdのパス
         """
         index_path = self.base_dir / self.config["output"]["index_file"]
+        # 手動編集されたエントリも拾えるよう、インデックス再生成時に検索索引も作り直す
+        self._inv_dirty = True
         entries = self.list_entries()
+        updated_at = datetime.now().strftime(self.config["output"]["datetime_format"])
 
-        lines = [
-            "# AI開発 ナレッジベース インデックス",
-            "",
-            f"最終更新: {datetime.now().strftime(self.config['output']['datetime_format'])}",
-            "",
-            f"総エントリ数: {len(entries)}",
-            "",
-        ]
-
-        # テキストエントリ
-        text_entries = [e for e in entries if e["type"] == "text"]
-        if text_entries:
-            lines.append("## テキスト")
-            lines.append("")
-            for entry in text_entries:
-                tags_str = ", ".join(entry.get("tags", []))
-                tags_display = f" `{tags_str}`" if tags_str else ""
-                lines.append(
-                    f"- [{entry['title']}]({entry['path']}) "
-                    f"[{entry['category']}]{tags_display} "
-                    f"({entry['created_at']})"
-                )
-            lines.append("")
-
-        # 画像エントリ
-        image_entries = [e for e in entries if e["type"] == "image"]
-        if image_entries:
-            lines.append("## 画像")
-            lines.append("")
-            for entry in image_entries:
-                tags_str = ", ".join(entry.get("tags", []))
-                tags_display = f" `{tags_str}`" if tags_str else ""
-                lines.append(
-                    f"- [{entry['title']}]({entry['path']}) "
-                    f"[{entry['category']}]{tags_display} "
-                    f"({entry['created_at']})"
-                )
-            lines.append("")
+        text_entries: list[dict] = []
+        image_entries: list[dict] = []
+        for entry in entries:
+            (text_entries if entry["type"] == "text" else image_entries).append(entry)
 
         index_path.parent.mkdir(parents=True, exist_ok=True)
-        index_path.write_text("\n".join(lines), encoding="utf-8")
+        # 行リストを組み立てて join せず、バッファ付きで直接書き出す
+        with open(index_path, "w", encoding="utf-8", buffering=1 << 20) as f:
+            f.write("# AI開発 ナレッジベース インデックス\n\n")
+            f.write(f"最終更新: {updated_at}\n\n")
+            f.write(f"総エントリ数: {len(entries)}\n")
+
+            for heading, section in (("テキスト", text_entries), ("画像", image_entries)):
+                if not section:
+                    continue
+                f.write(f"\n## {heading}\n\n")
+                for entry in section:
+                    tags_str = ", ".join(entry.get("tags", []))
+                    tags_display = f" `{tags_str}`" if tags_str else ""
+                    f.write(
+                        f"- [{entry['title']}]({entry['path']}) "
+                        f"[{entry['category']}]{tags_display} "
+                        f"({entry['created_at']})\n"
+                    )
+
         return index_path
 
     def get_stats(self) -> dict:
         """ナレッジベースの統計情報を返す"""
         entries = self.list_entries()
-        text_entries = [e for e in entries if e["type"] == "text"]
-        image_entries = [e for e in entries if e["type"] == "image"]
-
-        text_categories: dict[str, int] = {}
-        for e in text_entries:
-            cat = e.get("category", "unknown")
-            text_categories[cat] = text_categories.get(cat, 0) + 1
 
-        image_categories: dict[str, int] = {}
-        for e in image_entries:
-            cat = e.get("category", "unknown")
-            image_categories[cat] = image_categories.get(cat, 0) + 1
+        # (種類, カテゴリ) の組を1回の走査で数え、件数もそこから求める
+        counts = Counter((e["type"], e.get("category", "unknown")) for e in entries)
+        text_categories = {cat: n for (t, cat), n in counts.items() if t == "text"}
+        image_categories = {cat: n for (t, cat), n in counts.items() if t != "text"}
 
         return {
             "total": len(entries),
-            "text_count": len(text_entries),
-            "image_count": len(image_entries),
+            "text_count": sum(text_categories.values()),
+            "image_count": sum(image_categories.values()),
             "text_by_category": text_categories,
             "image_by_category": image_categories,
         }
@@ -0,0 +1,101 @@
+"""パース済みエントリのキャッシュ
+
+ファイルの (mtime_ns, size) が変わらない限り、YAMLを再パースせずに
+前回の結果を返す。CLIの起動をまたいで効くよう、終了時にpickleで保存する。
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import pickle
+from pathlib import Path
+from typing import Optional
+
+# キャッシュファイルの形式バージョン。形式を変えたら上げて古いキャッシュを無視させる
+_FORMAT_VERSION = 2
+
+
+class EntryCache:
+    """ファイルパスをキーにしたエントリ情報のキャッシュ"""
+
+    def __init__(self, cache_path: Path) -> None:
+        self.cache_path = cache_path
+        self._entries: dict[Path, tuple[int, int, dict, bool]] = self._load()
+        self._dirty = False
+        atexit.register(self.save)
+
+    def get(
+        self,
+        path: Path,
+        st: os.stat_result,
+        need_complete: bool = True,
+    ) -> Optional[dict]:
+        """ファイルが変更されていなければキャッシュ済みのエントリを返す
+
+        Args:
+            path: エントリファイルのパス
+            st: ファイルの stat 結果
+            need_complete: 本文など全フィールドが必要か。Falseならヘッダのみの結果も返す
+        """
+        cached = self._entries.get(path)
+        if cached is None or cached[0] != st.st_mtime_ns or cached[1] != st.st_size:
+            return None
+        if need_complete and not cached[3]:
+            return None
+        return dict(cached[2])
+
+    def put(
+        self,
+        path: Path,
+        st: os.stat_result,
+        entry: dict,
+        complete: bool = True,
+    ) -> None:
+        """パース結果をキャッシュに登録する
+
+        Args:
+            path: エントリファイルのパス
+            st: ファイルの stat 結果
+            entry: パース済みエントリ
+            complete: 本文まで読み込んだ結果か
+        """
+        self._entries[path] = (st.st_mtime_ns, st.st_size, dict(entry), complete)
+        self._dirty = True
+
+    def sweep(self, seen: set[Path]) -> None:
+        """走査で見つからなかった（削除された）ファイルのキャッシュを破棄する"""
+        stale = set(self._entries) - seen
+        for path in stale:
+            del self._entries[path]
+        if stale:
+            self._dirty = True
+
+    def save(self) -> None:
+        """キャッシュをディスクへ保存する（変更がなければ何もしない）"""
+        if not self._dirty:
+            return
+        try:
+            # プロジェクトディレクトリ自体が消えている場合に作り直さないよう parents=False
+            self.cache_path.parent.mkdir(exist_ok=True)
+            tmp_path = self.cache_path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                pickle.dump(
+                    (_FORMAT_VERSION, self._entries), f, protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(tmp_path, self.cache_path)
+            self._dirty = False
+        except OSError:
+            # キャッシュは最適化にすぎないため、保存できなくても処理は継続する
+            pass
+
+    def _load(self) -> dict[Path, tuple[int, int, dict, bool]]:
+        """保存済みキャッシュを読み込む。壊れている・形式が古い場合は空から始める"""
+        try:
+            with open(self.cache_path, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            return {}
+        if not isinstance(data, tuple) or len(data) != 2 or data[0] != _FORMAT_VERSION:
+            return {}
+        return data[1]
@@ -0,0 +1,180 @@
+"""ファイル作成の共通処理
+
+テキスト・画像の両ハンドラから使う、重複しないファイル名の確保・
+ファイルのコピー・メタデータ（YAML）の書き出しを担当する。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import secrets
+import shutil
+import sys
+from pathlib import Path
+from typing import Optional
+
+import yaml
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:  # libyaml なしでビルドされた PyYAML
+    from yaml import SafeDumper
+
+# 接尾辞付きの名前で作成を試みる回数（3バイトの乱数なので衝突はまず起きない）
+_MAX_SUFFIX_ATTEMPTS = 3
+
+# JSON文字列のままではYAMLとして読めない文字。PyYAMLが受け付けない非表示文字と、
+# ダブルクォート内で改行として扱われる NEL / U+2028 / U+2029
+_YAML_UNSAFE_CHARS = re.compile(
+    "[^\x09\x0A\x0D\x20-\x7E\xA0-\u2027\u202A-\uD7FF\uE000-\uFFFD\U00010000-\U0010FFFF]"
+)
+
+
+def create_unique_file(directory: Path, stem: str, ext: str) -> tuple[Path, int]:
+    """重複しないファイルを排他的に作成する
+
+    既存ファイルを連番で1件ずつ stat して探す代わりに、O_EXCL で作成を試み、
+    衝突した場合のみランダムな接尾辞を付ける。
+
+    Args:
+        directory: 作成先ディレクトリ
+        stem: ファイル名（拡張子を除く）
+        ext: 拡張子（".md" など）
+
+    Returns:
+        作成したファイルのパスと、書き込み用に開いたファイルディスクリプタ
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+
+    path = directory / f"{stem}{ext}"
+    try:
+        return path, os.open(path, flags, 0o644)
+    except FileExistsError:
+        pass
+
+    for _ in range(_MAX_SUFFIX_ATTEMPTS):
+        path = directory / f"{stem}_{secrets.token_hex(3)}{ext}"
+        try:
+            return path, os.open(path, flags, 0o644)
+        except FileExistsError:
+            continue
+
+    raise FileExistsError(f"一意なファイル名を確保できません: {directory / stem}{ext}")
+
+
+def write_and_close(fd: int, buffers: list[bytes]) -> None:
+    """複数のバイト列を連結せずに書き込み、ファイルディスクリプタを閉じる
+
+    os.writev が使える環境では1回のシステムコールでまとめて書き込む
+    （書き切れなかった場合のみ残りを書き足す）。
+
+    Args:
+        fd: 書き込み用に開いたファイルディスクリプタ
+        buffers: 書き込むバイト列（この順に書かれる）
+    """
+    try:
+        if not hasattr(os, "writev"):
+            # Windows など writev がない環境
+            buffers = [b"".join(buffers)]
+        views = [memoryview(b) for b in buffers if b]
+        while views:
+            written = os.writev(fd, views) if len(views) > 1 else os.write(fd, views[0])
+            while views and written >= len(views[0]):
+                written -= len(views[0])
+                views.pop(0)
+            if views:
+                views[0] = views[0][written:]
+    finally:
+        os.close(fd)
+
+
+def copy_file(src: Path, dst: Path) -> None:
+    """ファイル内容をコピーし、更新時刻を元ファイルに揃える
+
+    対応するファイルシステムではコピーオンライトのクローン（macOS の clonefile、
+    Linux の copy_file_range による reflink）を使い、データを読み書きせずに複製する。
+    使えない環境では shutil.copyfile にフォールバックする。
+
+    Args:
+        src: コピー元
+        dst: コピー先
+    """
+    st = os.stat(src)
+    if not _clonefile(src, dst):
+        try:
+            _copy_file_range(src, dst, st.st_size)
+        except (OSError, AttributeError):
+            # copy_file_range 非対応（Linux以外・別ファイルシステム間など）
+            shutil.copyfile(src, dst)
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def _copy_file_range(src: Path, dst: Path, size: int) -> None:
+    """os.copy_file_range でカーネル内コピーする（reflink対応FSではクローンになる）"""
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        remaining = size
+        while remaining > 0:
+            copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+
+
+# macOS の clonefile(2)。初回呼び出し時に読み込む（False は利用不可）
+_clonefile_func: Optional[object] = None
+
+
+def _clonefile(src: Path, dst: Path) -> bool:
+    """macOS で clonefile によるクローンを試みる。成功した場合のみTrueを返す"""
+    global _clonefile_func
+    if sys.platform != "darwin":
+        return False
+    if _clonefile_func is None:
+        try:
+            import ctypes
+
+            _clonefile_func = ctypes.CDLL("libSystem.dylib", use_errno=True).clonefile
+        except (OSError, AttributeError):
+            _clonefile_func = False
+    if not _clonefile_func:
+        return False
+    # 既存ファイルへの上書きや別ボリューム間は失敗するため、呼び出し側でフォールバックする
+    return _clonefile_func(os.fsencode(src), os.fsencode(dst), 0) == 0
+
+
+def render_yaml_mapping(data: dict) -> str:
+    """平坦な辞書をYAMLのマッピングとして書き出す
+
+    フロントマターのように形が決まった小さな辞書向け。汎用のYAMLダンパーを通さず、
+    JSON表記（YAMLのサブセット）で値を書くことで書き込み時のコストを抑える。
+    キーの順序は辞書の挿入順を保つ。
+
+    Args:
+        data: 値が文字列・文字列のリスト・数値・真偽値・None の辞書
+
+    Returns:
+        "key: value" を改行で連結した文字列（末尾改行なし）
+    """
+    return "\n".join(f"{key}: {_render_yaml_value(value)}" for key, value in data.items())
+
+
+def _render_yaml_value(value: object) -> str:
+    """値をYAMLのフロー表記で返す"""
+    if isinstance(value, str):
+        rendered = json.dumps(value, ensure_ascii=False)
+        if _YAML_UNSAFE_CHARS.search(rendered):
+            # まれなケースのみ汎用ダンパーでエスケープさせる
+            dumped = yaml.dump(
+                value,
+                Dumper=SafeDumper,
+                allow_unicode=True,
+                default_style='"',
+                width=2**31 - 1,
+            )
+            return dumped.rstrip("\n")
+        return rendered
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(_render_yaml_value(v) for v in value) + "]"
+    return json.dumps(value)
@@ -5,24 +5,71 @@
 
 from __future__ import annotations
 
+import json
+import os
 import re
-import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 from typing import Optional
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # libyaml なしでビルドされた PyYAML
+    from yaml import SafeLoader
+
+from src.entry_cache import EntryCache
+from src.file_utils import copy_file, create_unique_file, render_yaml_mapping
+
+# この件数以上のファイルを読む場合にスレッドプールを使う（少数ではスレッド起動の方が高くつく）
+_PARALLEL_READ_THRESHOLD = 16
+
+# 英数字・ひらがな・カタカナ・漢字・ハイフン・アンダースコア以外
+_SLUG_INVALID_CHARS = re.compile(r"[^\w\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FFF-]")
+_SLUG_REPEATED_UNDERSCORES = re.compile(r"_+")
+
 
 class ImageHandler:
     """画像エントリの管理クラス"""
 
     def __init__(self, base_dir: Path, config: dict) -> None:
         self.base_dir = base_dir
+        # エントリパスを相対表記にする際、Path.relative_to を毎回呼ばずに済ませる
+        self._base_prefix = os.path.join(str(base_dir), "")
         self.config = config
         self.image_dir = base_dir / config["content"]["images"]["directory"]
         self.image_dir.mkdir(parents=True, exist_ok=True)
         self.allowed_extensions = config["content"]["images"]["allowed_extensions"]
+        cache_dir = base_dir / config.get("cache", {}).get("directory", ".cache")
+        self._entry_cache = EntryCache(cache_dir / "image_entries.pkl")
+
+    def check_image_path(self, image_path: str) -> tuple[Path, str]:
+        """登録できる画像ファイルか確認する
+
+        Args:
+            image_path: 元画像ファイルのパス
+
+        Returns:
+            (解決済みの元画像パス, 小文字の拡張子)
+
+        Raises:
+            FileNotFoundError: ファイルが存在しない場合
+            ValueError: 許可されていない拡張子の場合
+        """
+        src_path = Path(image_path).resolve()
+        if not src_path.exists():
+            raise FileNotFoundError(f"画像ファイルが見つかりません: {image_path}")
+
+        ext = src_path.suffix.lower()
+        if ext not in self.allowed_extensions:
+            raise ValueError(
+                f"サポートされていない画像形式: {ext}  "
+                f"(許可: {', '.join(self.allowed_extensions)})"
+            )
+        return src_path, ext
 
     def register_image(
         self,
@@ -46,16 +93,7 @@ class ImageHandler:
         Returns:
             作成されたメタデータファイルのパス
         """
-        src_path = Path(image_path).resolve()
-        if not src_path.exists():
-            raise FileNotFoundError(f"画像ファイルが見つかりません: {image_path}")
-
-        ext = src_path.suffix.lower()
-        if ext not in self.allowed_extensions:
-            raise ValueError(
-                f"サポートされていない画像形式: {ext}  "
-                f"(許可: {', '.join(self.allowed_extensions)})"
-            )
+        src_path, ext = self.check_image_path(image_path)
 
         now = datetime.now()
         date_str = now.strftime(self.config["output"]["date_format"])
@@ -67,20 +105,21 @@ class ImageHandler:
         category_dir = self.image_dir / category
         category_dir.mkdir(parents=True, exist_ok=True)
 
-        # 画像ファイルをコピー
-        image_filename = f"{date_str}_{slug}{ext}"
+        # メタデータファイルを排他的に確保し、画像ファイル名はその名前に揃える
+        # （重複回避の接尾辞が付いても画像とメタデータの対応が崩れないように）
+        meta_path, fd = create_unique_file(
+            category_dir, f"{date_str}_{slug}", ".meta.yaml"
+        )
+        image_filename = meta_path.name[: -len(".meta.yaml")] + ext
         dest_image = category_dir / image_filename
-        counter = 1
-        while dest_image.exists():
-            image_filename = f"{date_str}_{slug}_{counter}{ext}"
-            dest_image = category_dir / image_filename
-            counter += 1
-
-        shutil.copy2(src_path, dest_image)
 
-        # メタデータファイル作成
-        meta_filename = f"{date_str}_{slug}.meta.yaml"
-        meta_path = category_dir / meta_filename
+        # 画像ファイルをコピー
+        try:
+            copy_file(src_path, dest_image)
+        except BaseException:
+            os.close(fd)
+            meta_path.unlink(missing_ok=True)
+            raise
 
         metadata = {
             "title": title,
@@ -94,30 +133,52 @@ class ImageHandler:
             "status": "draft",
         }
 
-        with open(meta_path, "w", encoding="utf-8") as f:
-            yaml.dump(metadata, f, allow_unicode=True, default_flow_style=False)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(render_yaml_mapping(metadata) + "\n")
+
+        # 読み込み高速化用のJSONサイドカー（.meta.yaml が正、こちらは派生物）
+        meta_path.with_suffix(".json").write_text(
+            json.dumps(metadata, ensure_ascii=False), encoding="utf-8"
+        )
 
         return meta_path
 
-    def read_entry(self, meta_path: Path) -> dict:
+    def read_entry(
+        self,
+        meta_path: Path,
+        fields: Optional[frozenset[str]] = None,
+        st: Optional[os.stat_result] = None,
+    ) -> dict:
         """画像エントリのメタデータを読み込む
 
         Args:
             meta_path: メタデータファイルのパス
+            fields: 返すフィールド名。Noneの場合は全フィールド
+            st: 取得済みのstat結果（省略時はここでstatする）
 
         Returns:
             パースされたエントリ情報
         """
-        with open(meta_path, encoding="utf-8") as f:
-            metadata = yaml.safe_load(f) or {}
+        if st is None:
+            st = meta_path.stat()
+        entry = self._entry_cache.get(meta_path, st)
+        if entry is None:
+            entry = self._parse_entry(meta_path, st)
+        if fields is None:
+            return entry
+        return {k: v for k, v in entry.items() if k in fields}
+
+    def _parse_entry(self, meta_path: Path, st: os.stat_result) -> dict:
+        """メタデータをパースし、全フィールドをキャッシュに登録する"""
+        metadata = self._load_metadata(meta_path, st)
 
         image_file = metadata.get("image_file", "")
         image_path = meta_path.parent / image_file if image_file else None
 
-        return {
+        entry = {
             "type": "image",
-            "path": str(meta_path.relative_to(self.base_dir)),
-            "image_path": str(image_path.relative_to(self.base_dir)) if image_path else "",
+            "path": str(meta_path).removeprefix(self._base_prefix),
+            "image_path": str(image_path).removeprefix(self._base_prefix) if image_path else "",
             "title": metadata.get("title", ""),
             "category": metadata.get("category", ""),
             "created_at": metadata.get("created_at", ""),
@@ -126,50 +187,109 @@ class ImageHandler:
             "source": metadata.get("source", ""),
             "status": metadata.get("status", ""),
         }
+        self._entry_cache.put(meta_path, st, entry)
+        return entry
+
+    def _load_metadata(self, meta_path: Path, st: os.stat_result) -> dict:
+        """メタデータを読み込む。YAMLより新しいJSONサイドカーがあればそちらを使う"""
+        json_path = meta_path.with_suffix(".json")
+        try:
+            if json_path.stat().st_mtime_ns >= st.st_mtime_ns:
+                return json.loads(json_path.read_text(encoding="utf-8")) or {}
+        except (OSError, ValueError):
+            pass
+
+        with open(meta_path, encoding="utf-8") as f:
+            return yaml.load(f, Loader=SafeLoader) or {}
 
     def list_entries(
         self,
         category: Optional[str] = None,
         tag: Optional[str] = None,
+        fields: Optional[frozenset[str]] = None,
     ) -> list[dict]:
         """画像エントリの一覧を取得する
 
         Args:
             category: カテゴリでフィルタ
             tag: タグでフィルタ
+            fields: 返すフィールド名。Noneの場合は全フィールド
 
         Returns:
             エントリ情報のリスト
         """
-        entries: list[dict] = []
+        files = self._scan_files(category)
+        paths = [path for path, _ in files]
+        seen = set(paths)
+
+        # ファイル読み込みとパースはI/O待ちが主のため、件数が多い場合はスレッドで並列化する
+        # タグで絞り込む場合は tags を必ず読み込む
+        if tag and fields is not None:
+            fields = fields | {"tags"}
+        read = partial(self._try_read_entry, fields=fields)
+        if len(paths) >= _PARALLEL_READ_THRESHOLD:
+            with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as ex:
+                results = list(ex.map(read, paths, [st for _, st in files]))
+        else:
+            results = [read(path, st) for path, st in files]
+
+        entries = [
+            e for e in results
+            if e is not None and (not tag or tag in e.get("tags", []))
+        ]
+
+        # 全カテゴリを走査した場合のみ、削除済みファイルのキャッシュを掃除できる
+        if not category:
+            self._entry_cache.sweep(seen)
+
+        return entries
+
+    def _scan_files(self, category: Optional[str]) -> list[tuple[Path, os.stat_result]]:
+        """エントリファイルとそのstat結果を列挙する
 
-        search_dirs = []
+        os.scandir の DirEntry から得た stat を read_entry に渡し、再度の stat を省く。
+        """
         if category:
-            cat_dir = self.image_dir / category
-            if cat_dir.exists():
-                search_dirs.append(cat_dir)
+            search_dirs = [self.image_dir / category]
         else:
-            search_dirs = [
-                d for d in self.image_dir.iterdir()
-                if d.is_dir() and not d.name.startswith(".")
-            ]
+            with os.scandir(self.image_dir) as it:
+                search_dirs = [
+                    Path(e.path) for e in it
+                    if e.is_dir() and not e.name.startswith(".")
+                ]
 
+        files: list[tuple[Path, os.stat_result]] = []
         for search_dir in search_dirs:
-            for meta_file in search_dir.glob("*.meta.yaml"):
-                try:
-                    entry = self.read_entry(meta_file)
-                    if tag and tag not in entry.get("tags", []):
-                        continue
-                    entries.append(entry)
-                except Exception:
-                    continue
-
-        return entries
+            try:
+                with os.scandir(search_dir) as it:
+                    for e in it:
+                        if e.name.endswith(".meta.yaml") and e.is_file(follow_symlinks=False):
+                            files.append((Path(e.path), e.stat(follow_symlinks=False)))
+            except OSError:
+                # カテゴリディレクトリが存在しない場合など
+                continue
+
+        # ファイル名は日付で始まるため、名前の降順に並べるとほぼ新しい順になる
+        # （呼び出し側の作成日時ソートがほぼ整列済みの入力で済む）
+        files.sort(key=lambda f: f[0].name, reverse=True)
+        return files
+
+    def _try_read_entry(
+        self,
+        meta_path: Path,
+        st: Optional[os.stat_result] = None,
+        fields: Optional[frozenset[str]] = None,
+    ) -> Optional[dict]:
+        """エントリを読み込む。壊れたファイルは一覧から除外するためNoneを返す"""
+        try:
+            return self.read_entry(meta_path, fields=fields, st=st)
+        except Exception:
+            return None
 
     def _slugify(self, text: str) -> str:
         """タイトルをファイル名用のスラグに変換する"""
-        slug = re.sub(r"[^\w\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FFF-]", "_", text)
-        slug = re.sub(r"_+", "_", slug).strip("_")
+        slug = _SLUG_INVALID_CHARS.sub("_", text)
+        slug = _SLUG_REPEATED_UNDERSCORES.sub("_", slug).strip("_")
         if len(slug) > 80:
             slug = slug[:80].rstrip("_")
         return slug
@@ -5,22 +5,53 @@ Markdown形式のテキストエントリの作成・読取・一覧を担当す
 
 from __future__ import annotations
 
+import mmap
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 from typing import Optional
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # libyaml なしでビルドされた PyYAML
+    from yaml import SafeLoader
+
+from src.entry_cache import EntryCache
+from src.file_utils import create_unique_file, render_yaml_mapping, write_and_close
+
+# フロントマターのみ読む場合に先頭から読み込むバイト数
+_HEADER_CHUNK_SIZE = 8192
+
+# この件数以上のファイルを読む場合にスレッドプールを使う（少数ではスレッド起動の方が高くつく）
+_PARALLEL_READ_THRESHOLD = 16
+
+# 英数字・ひらがな・カタカナ・漢字・ハイフン・アンダースコア以外
+_SLUG_INVALID_CHARS = re.compile(r"[^\w\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FFF-]")
+_SLUG_REPEATED_UNDERSCORES = re.compile(r"_+")
+_FRONTMATTER_PATTERN = re.compile(r"^---\s*\n(.*?)\n---\s*\n(.*)$", re.DOTALL)
+# フロントマター終わりの区切り線（_FRONTMATTER_PATTERN と同じ規則のバイト列版）
+_FRONTMATTER_END_PATTERN = re.compile(rb"\n---\s*\n")
+
 
 class TextHandler:
     """テキストエントリの管理クラス"""
 
     def __init__(self, base_dir: Path, config: dict) -> None:
         self.base_dir = base_dir
+        # エントリパスを相対表記にする際、Path.relative_to を毎回呼ばずに済ませる
+        self._base_prefix = os.path.join(str(base_dir), "")
         self.config = config
         self.text_dir = base_dir / config["content"]["text"]["directory"]
         self.text_dir.mkdir(parents=True, exist_ok=True)
+        cache_dir = base_dir / config.get("cache", {}).get("directory", ".cache")
+        self._entry_cache = EntryCache(cache_dir / "text_entries.pkl")
+        # 作成済みのカテゴリディレクトリ（連続追加時に mkdir を繰り返さない）
+        self._category_dirs: set[Path] = set()
 
     def create_entry(
         self,
@@ -48,19 +79,12 @@ class TextHandler:
 
         # ファイル名生成: YYYY-MM-DD_slug.md
         slug = self._slugify(title)
-        filename = f"{date_str}_{slug}.md"
 
         # カテゴリディレクトリ
         category_dir = self.text_dir / category
-        category_dir.mkdir(parents=True, exist_ok=True)
-        file_path = category_dir / filename
-
-        # 重複回避
-        counter = 1
-        while file_path.exists():
-            filename = f"{date_str}_{slug}_{counter}.md"
-            file_path = category_dir / filename
-            counter += 1
+        if category_dir not in self._category_dirs:
+            category_dir.mkdir(parents=True, exist_ok=True)
+            self._category_dirs.add(category_dir)
 
         # YAML Front Matter + 本文
         frontmatter = {
@@ -73,35 +97,63 @@ class TextHandler:
             "status": "draft",
         }
 
-        content_lines = [
-            "---",
-            yaml.dump(frontmatter, allow_unicode=True, default_flow_style=False).strip(),
-            "---",
-            "",
-            f"# {title}",
-            "",
-            body,
-            "",
+        # 各部分を連結せずにエンコードしておき、1回の writev で書き出す
+        buffers = [
+            b"---\n",
+            render_yaml_mapping(frontmatter).encode("utf-8"),
+            b"\n---\n\n# ",
+            title.encode("utf-8"),
+            b"\n\n",
+            body.encode("utf-8"),
+            b"\n",
         ]
 
-        file_path.write_text("\n".join(content_lines), encoding="utf-8")
+        # 重複回避（既存時はランダムな接尾辞を付けて排他的に作成）
+        file_path, fd = create_unique_file(category_dir, f"{date_str}_{slug}", ".md")
+        write_and_close(fd, buffers)
         return file_path
 
-    def read_entry(self, file_path: Path) -> dict:
+    def read_entry(
+        self,
+        file_path: Path,
+        fields: Optional[frozenset[str]] = None,
+        st: Optional[os.stat_result] = None,
+    ) -> dict:
         """テキストエントリを読み込む
 
         Args:
             file_path: エントリファイルのパス
+            fields: 返すフィールド名。Noneの場合は全フィールド。
+                "body" を含まない場合はフロントマターのみ読み込む
+            st: 取得済みのstat結果（省略時はここでstatする）
 
         Returns:
             パースされたエントリ情報
         """
-        text = file_path.read_text(encoding="utf-8")
+        if st is None:
+            st = file_path.stat()
+        load_body = fields is None or "body" in fields
+        entry = self._entry_cache.get(file_path, st, need_complete=load_body)
+        if entry is None:
+            entry = self._parse_entry(file_path, st, load_body)
+        if fields is None:
+            return entry
+        return {k: v for k, v in entry.items() if k in fields}
+
+    def _parse_entry(self, file_path: Path, st: os.stat_result, load_body: bool) -> dict:
+        """エントリファイルをパースし、全フィールドをキャッシュに登録する
+
+        load_body が False の場合、body は空文字になる。
+        """
+        text = None if load_body else self._read_header(file_path)
+        complete = text is None
+        if text is None:
+            text = file_path.read_text(encoding="utf-8")
         frontmatter, body = self._parse_frontmatter(text)
 
-        return {
+        entry = {
             "type": "text",
-            "path": str(file_path.relative_to(self.base_dir)),
+            "path": str(file_path).removeprefix(self._base_prefix),
             "title": frontmatter.get("title", ""),
             "category": frontmatter.get("category", ""),
             "created_at": frontmatter.get("created_at", ""),
@@ -111,51 +163,142 @@ class TextHandler:
             "status": frontmatter.get("status", ""),
             "body": body.strip(),
         }
+        self._entry_cache.put(file_path, st, entry, complete=complete)
+        return entry
+
+    def _read_header(self, file_path: Path) -> Optional[str]:
+        """ファイル先頭からフロントマター部分だけを読み込む
+
+        Returns:
+            フロントマター（区切り線を含む）。先頭チャンク内に収まらない場合はNone。
+        """
+        with open(file_path, "rb") as f:
+            head = f.read(_HEADER_CHUNK_SIZE)
+        if not head.startswith(b"---"):
+            return None
+        # 最初の区切り線らしき行がちょうど "---" でなければ、全体を読んでregexに任せる
+        end = head.find(b"\n---", 3)
+        if end < 0 or head[end + 4:end + 5] != b"\n":
+            return None
+        return head[:end + 5].decode("utf-8")
+
+    def find_in_body(self, file_path: Path, needle: bytes, ignore_case: bool = False) -> bool:
+        """エントリ本文にバイト列が含まれるかを、ファイルをデコードせずに調べる
+
+        mmap 上の find（libc の memmem 相当）で探すため、大きな本文でも
+        Python 文字列を作らずに済む。ignore_case では ASCII の大文字・小文字だけを
+        同一視する（バイト列の正規表現で探す）。
+
+        Args:
+            file_path: エントリファイルのパス
+            needle: UTF-8 でエンコードした検索語
+            ignore_case: ASCII の大文字・小文字を区別しないか
+
+        Returns:
+            フロントマターより後ろに needle が含まれるか
+        """
+        with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return False
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                start = 0
+                if mm[:3] == b"---":
+                    match = _FRONTMATTER_END_PATTERN.search(mm, 3)
+                    if match:
+                        start = match.end()
+                if ignore_case:
+                    pattern = re.compile(re.escape(needle), re.IGNORECASE)
+                    return pattern.search(mm, start) is not None
+                return mm.find(needle, start) >= 0
 
     def list_entries(
         self,
         category: Optional[str] = None,
         tag: Optional[str] = None,
+        fields: Optional[frozenset[str]] = None,
     ) -> list[dict]:
         """テキストエントリの一覧を取得する
 
         Args:
             category: カテゴリでフィルタ
             tag: タグでフィルタ
+            fields: 返すフィールド名。Noneの場合は全フィールド
 
         Returns:
             エントリ情報のリスト
         """
-        entries: list[dict] = []
+        files = self._scan_files(category)
+        paths = [path for path, _ in files]
+        seen = set(paths)
+
+        # ファイル読み込みとパースはI/O待ちが主のため、件数が多い場合はスレッドで並列化する
+        # タグで絞り込む場合は tags を必ず読み込む
+        if tag and fields is not None:
+            fields = fields | {"tags"}
+        read = partial(self._try_read_entry, fields=fields)
+        if len(paths) >= _PARALLEL_READ_THRESHOLD:
+            with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as ex:
+                results = list(ex.map(read, paths, [st for _, st in files]))
+        else:
+            results = [read(path, st) for path, st in files]
+
+        entries = [
+            e for e in results
+            if e is not None and (not tag or tag in e.get("tags", []))
+        ]
+
+        # 全カテゴリを走査した場合のみ、削除済みファイルのキャッシュを掃除できる
+        if not category:
+            self._entry_cache.sweep(seen)
+
+        return entries
 
-        search_dirs = []
+    def _scan_files(self, category: Optional[str]) -> list[tuple[Path, os.stat_result]]:
+        """エントリファイルとそのstat結果を列挙する
+
+        os.scandir の DirEntry から得た stat を read_entry に渡し、再度の stat を省く。
+        """
         if category:
-            cat_dir = self.text_dir / category
-            if cat_dir.exists():
-                search_dirs.append(cat_dir)
+            search_dirs = [self.text_dir / category]
         else:
-            search_dirs = [
-                d for d in self.text_dir.iterdir()
-                if d.is_dir() and not d.name.startswith(".")
-            ]
+            with os.scandir(self.text_dir) as it:
+                search_dirs = [
+                    Path(e.path) for e in it
+                    if e.is_dir() and not e.name.startswith(".")
+                ]
 
+        files: list[tuple[Path, os.stat_result]] = []
         for search_dir in search_dirs:
-            for md_file in search_dir.glob("*.md"):
-                try:
-                    entry = self.read_entry(md_file)
-                    if tag and tag not in entry.get("tags", []):
-                        continue
-                    entries.append(entry)
-                except Exception:
-                    continue
+            try:
+                with os.scandir(search_dir) as it:
+                    for e in it:
+                        if e.name.endswith(".md") and e.is_file(follow_symlinks=False):
+                            files.append((Path(e.path), e.stat(follow_symlinks=False)))
+            except OSError:
+                # カテゴリディレクトリが存在しない場合など
+                continue
 
-        return entries
+        # ファイル名は日付で始まるため、名前の降順に並べるとほぼ新しい順になる
+        # （呼び出し側の作成日時ソートがほぼ整列済みの入力で済む）
+        files.sort(key=lambda f: f[0].name, reverse=True)
+        return files
+
+    def _try_read_entry(
+        self,
+        file_path: Path,
+        st: Optional[os.stat_result] = None,
+        fields: Optional[frozenset[str]] = None,
+    ) -> Optional[dict]:
+        """エントリを読み込む。壊れたファイルは一覧から除外するためNoneを返す"""
+        try:
+            return self.read_entry(file_path, fields=fields, st=st)
+        except Exception:
+            return None
 
     def _slugify(self, text: str) -> str:
         """タイトルをファイル名用のスラグに変換する"""
-        # 英数字・ひらがな・カタカナ・漢字・ハイフン・アンダースコア以外を除去
-        slug = re.sub(r"[^\w\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FFF-]", "_", text)
-        slug = re.sub(r"_+", "_", slug).strip("_")
+        slug = _SLUG_INVALID_CHARS.sub("_", text)
+        slug = _SLUG_REPEATED_UNDERSCORES.sub("_", slug).strip("_")
         # 長すぎる場合は切り詰め
         if len(slug) > 80:
             slug = slug[:80].rstrip("_")
@@ -163,14 +306,22 @@ class TextHandler:
 
     def _parse_frontmatter(self, text: str) -> tuple[dict, str]:
         """YAML Front Matterと本文を分離する"""
-        pattern = r"^---\s*\n(.*?)\n---\s*\n(.*)$"
-        match = re.match(pattern, text, re.DOTALL)
-        if match:
+        # create_entry が書き出す形式は区切り線の文字列検索だけで分離できる。
+        # 最初の区切り線らしき行がちょうど "---" のときだけ使い、本文の水平線で切らない
+        end = text.find("\n---", 3) if text.startswith("---\n") else -1
+        if end >= 0 and text.startswith("\n", end + 4):
+            fm_text = text[4:end]
+            body = text[end + 5:]
+        else:
+            # 手編集による CRLF や区切り線後の空白などはregexで吸収する
+            match = _FRONTMATTER_PATTERN.match(text)
+            if not match:
+                return {}, text
             fm_text = match.group(1)
             body = match.group(2)
-            try:
-                frontmatter = yaml.safe_load(fm_text) or {}
-            except yaml.YAMLError:
-                frontmatter = {}
-            return frontmatter, body
-        return {}, text
+
+        try:
+            frontmatter = yaml.load(fm_text, Loader=SafeLoader) or {}
+        except yaml.YAMLError:
+            frontmatter = {}
+        return frontmatter, body
@@ -2,13 +2,18 @@
 
 from __future__ import annotations
 
+import io
+import json
+import os
 import shutil
+import sys
 import tempfile
 from pathlib import Path
 
 import pytest
 import yaml
 
+from main import cmd_bulk
 from src.content_manager import ContentManager
 
 
@@ -56,6 +61,12 @@ class TestAddText:
         assert "テスト会話" in content
         assert "これはテストの本文です。" in content
 
+    def test_file_layout(self, manager: ContentManager) -> None:
+        path = manager.add_text(title="構成", body="一行目\n二行目")
+        content = path.read_text(encoding="utf-8")
+        assert content.startswith("---\ntitle: \"構成\"\n")
+        assert content.endswith("\n---\n\n# 構成\n\n一行目\n二行目\n")
+
     def test_add_with_tags(self, manager: ContentManager) -> None:
         path = manager.add_text(
             title="タグ付きエントリ",
@@ -83,6 +94,106 @@ class TestAddText:
         md_files = list(spec_dir.glob("*.md"))
         assert len(md_files) == 1
 
+    def test_frontmatter_roundtrip(self, manager: ContentManager) -> None:
+        title = 'yes: "引用" #1\x85'
+        path = manager.add_text(title=title, body="本文", tags=["2026-01-01", "null"])
+        entry = manager.text_handler.read_entry(path)
+        assert entry["title"] == title
+        assert entry["tags"] == ["2026-01-01", "null"]
+        assert isinstance(entry["created_at"], str)
+
+    def test_hand_edited_delimiter_before_horizontal_rule(
+        self, manager: ContentManager, temp_project: Path
+    ) -> None:
+        """閉じ区切り線に空白があっても、本文の水平線でフロントマターを切らないこと"""
+        path = temp_project / "content" / "text" / "reference" / "2026-01-01_手編集.md"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            "---\ntitle: 手編集\ncategory: reference\n--- \n前半\n---\nkey: 本文\n",
+            encoding="utf-8",
+        )
+        header = manager.text_handler.read_entry(path, fields=frozenset({"title"}))
+        assert header == {"title": "手編集"}
+        entry = manager.text_handler.read_entry(path)
+        assert entry["title"] == "手編集"
+        assert entry["body"] == "前半\n---\nkey: 本文"
+        assert manager.text_handler.find_in_body(path, "前半".encode("utf-8"))
+
+    def test_duplicate_title(self, manager: ContentManager) -> None:
+        first = manager.add_text(title="重複", body="1件目")
+        second = manager.add_text(title="重複", body="2件目")
+        assert first != second
+        assert "1件目" in first.read_text(encoding="utf-8")
+        assert "2件目" in second.read_text(encoding="utf-8")
+
+
+class TestBatchAddText:
+    """テキストエントリの一括追加テスト"""
+
+    def test_batch_add(self, manager: ContentManager) -> None:
+        paths = manager.batch_add_text([
+            {"title": "一括1", "body": "a", "category": "decision"},
+            {"title": "一括2", "body": "b", "tags": ["x"]},
+        ])
+        assert len(paths) == 2
+        assert all(p.exists() for p in paths)
+        assert len(manager.search("一括")) == 2
+        assert manager.get_stats()["text_by_category"] == {"decision": 1, "conversation": 1}
+
+
+class TestBulk:
+    """bulk コマンドのテスト"""
+
+    @pytest.mark.parametrize("bad_line, message", [
+        ({"type": "image", "title": "不在", "image_path": "/nonexistent/image.png"}, "2行目"),
+        ({"type": "image", "title": "BMP", "image_path": "BMP_PATH"}, "2行目"),
+        ({"title": "タグ不正", "body": "b", "tags": "認証"}, "tags"),
+        ({"title": "本文なし"}, "body がありません"),
+        ({"title": "本文が数値", "body": 5}, "body は文字列"),
+        ({"title": ["リスト"], "body": "b"}, "title は文字列"),
+        ({"type": "image", "title": "説明が数値", "image_path": "PNG_PATH", "description": 1},
+         "description は文字列"),
+        ({"type": "img", "title": "種別不明", "image_path": "PNG_PATH"}, "不明な type img"),
+    ])
+    def test_invalid_line_adds_nothing(
+        self, manager: ContentManager, tmp_path: Path, monkeypatch, capsys,
+        bad_line: dict, message: str,
+    ) -> None:
+        """不正な行があれば、テキストも含め何も追加せず行番号付きで終了コード 1 になること"""
+        bmp = tmp_path / "test.bmp"
+        bmp.write_bytes(b"BM")
+        png = tmp_path / "test.png"
+        png.write_bytes(b"\x89PNG\r\n\x1a\n")
+        paths = {"BMP_PATH": str(bmp), "PNG_PATH": str(png)}
+        if bad_line.get("image_path") in paths:
+            bad_line = {**bad_line, "image_path": paths[bad_line["image_path"]]}
+        lines = [{"title": "先に書かれる行", "body": "a"}, bad_line]
+        monkeypatch.setattr(sys, "stdin", io.StringIO("\n".join(json.dumps(r) for r in lines)))
+
+        with pytest.raises(SystemExit) as exc_info:
+            cmd_bulk(manager, None)
+        assert exc_info.value.code == 1
+        err = capsys.readouterr().err
+        assert "2行目" in err
+        assert message in err
+        assert manager.list_entries() == []
+        assert manager.list_entries(content_type="images") == []
+
+    def test_valid_lines_are_added(self, manager: ContentManager, tmp_path: Path, monkeypatch) -> None:
+        """正しい行はテキスト・画像とも追加され、INDEX.md が更新されること"""
+        png = tmp_path / "ok.png"
+        png.write_bytes(b"\x89PNG\r\n\x1a\n")
+        lines = [
+            {"title": "テキスト", "body": "本文", "source": None},
+            {"type": "image", "title": "画像", "image_path": str(png)},
+        ]
+        monkeypatch.setattr(sys, "stdin", io.StringIO("\n".join(json.dumps(r) for r in lines)))
+
+        cmd_bulk(manager, None)
+        assert [e["title"] for e in manager.list_entries(content_type="text")] == ["テキスト"]
+        assert [e["title"] for e in manager.list_entries(content_type="images")] == ["画像"]
+        assert (manager.base_dir / manager.config["output"]["index_file"]).exists()
+
 
 class TestAddImage:
     """画像エントリの追加テスト"""
@@ -106,6 +217,43 @@ class TestAddImage:
         assert meta["title"] == "テスト画像"
         assert meta["description"] == "テスト用の画像です"
 
+    def test_copy_keeps_content_and_mtime(self, manager: ContentManager, tmp_path: Path) -> None:
+        test_image = tmp_path / "copy.png"
+        test_image.write_bytes(b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 64)
+        os.utime(test_image, (1_600_000_000, 1_600_000_000))
+
+        manager.add_image(title="コピー", image_path=str(test_image))
+        entry = manager.list_entries(content_type="images", fields=None)[0]
+        copied = manager.base_dir / entry["image_path"]
+        assert copied.read_bytes() == test_image.read_bytes()
+        assert copied.stat().st_mtime == 1_600_000_000
+
+    def test_json_sidecar(self, manager: ContentManager, tmp_path: Path) -> None:
+        test_image = tmp_path / "sidecar.png"
+        test_image.write_bytes(b"\x89PNG\r\n\x1a\n")
+
+        path = manager.add_image(title="サイドカー", image_path=str(test_image), tags=["図"])
+        assert path.with_suffix(".json").exists()
+
+        entries = manager.list_entries(content_type="images")
+        assert entries[0]["title"] == "サイドカー"
+        assert entries[0]["tags"] == ["図"]
+
+    def test_duplicate_title(self, manager: ContentManager, tmp_path: Path) -> None:
+        test_image = tmp_path / "dup.png"
+        test_image.write_bytes(b"\x89PNG\r\n\x1a\n")
+
+        first = manager.add_image(title="重複画像", image_path=str(test_image))
+        second = manager.add_image(title="重複画像", image_path=str(test_image))
+        assert first != second
+
+        # メタデータが上書きされず、それぞれ自分の画像ファイルを指す
+        images = {
+            e["image_path"] for e in manager.list_entries(content_type="images", fields=None)
+        }
+        assert len(images) == 2
+        assert all((manager.base_dir / p).exists() for p in images)
+
     def test_unsupported_format(self, manager: ContentManager, tmp_path: Path) -> None:
         test_file = tmp_path / "test.bmp"
         test_file.write_bytes(b"\x00" * 10)
@@ -131,6 +279,22 @@ class TestListEntries:
         entries = manager.list_entries(content_type="text")
         assert len(entries) == 2
 
+    def test_newest_first(self, manager: ContentManager, temp_project: Path) -> None:
+        text_dir = temp_project / "content" / "text"
+        for category, name, created_at in [
+            ("decision", "2024-01-02_b", "2024-01-02 09:00:00"),
+            ("conversation", "2024-01-03_a", "2024-01-03 08:00:00"),
+            ("conversation", "2024-01-03_z", "2024-01-03 07:00:00"),
+            ("insight", "2024-01-01_c", "2024-01-01 10:00:00"),
+        ]:
+            (text_dir / category).mkdir(parents=True, exist_ok=True)
+            (text_dir / category / f"{name}.md").write_text(
+                f"---\ntitle: {name}\ncreated_at: '{created_at}'\n---\n", encoding="utf-8"
+            )
+
+        titles = [e["title"] for e in manager.list_entries()]
+        assert titles == ["2024-01-03_a", "2024-01-03_z", "2024-01-02_b", "2024-01-01_c"]
+
     def test_filter_by_category(self, manager: ContentManager) -> None:
         manager.add_text(title="会話1", body="a", category="conversation")
         manager.add_text(title="決定1", body="b", category="decision")
@@ -138,6 +302,23 @@ class TestListEntries:
         assert len(entries) == 1
         assert entries[0]["title"] == "会話1"
 
+    def test_body_not_loaded(self, manager: ContentManager) -> None:
+        manager.add_text(title="本文省略", body="長い本文", category="conversation")
+        assert "body" not in manager.list_entries()[0]
+        assert manager.list_entries(fields=None)[0]["body"].endswith("長い本文")
+
+    def test_fields_projection(self, manager: ContentManager, tmp_path: Path) -> None:
+        test_image = tmp_path / "fields.png"
+        test_image.write_bytes(b"\x89PNG\r\n\x1a\n")
+        manager.add_text(title="射影", body="本文", tags=["a"])
+        manager.add_image(title="射影画像", image_path=str(test_image), description="説明")
+
+        for entry in manager.list_entries():
+            assert set(entry) == {"type", "path", "title", "category", "created_at", "tags"}
+
+        entries = manager.list_entries(tag="a", fields=frozenset({"title"}))
+        assert [e["title"] for e in entries] == ["射影"]
+
 
 class TestSearch:
     """検索テスト"""
@@ -160,6 +341,84 @@ class TestSearch:
         results = manager.search("存在しないキーワード")
         assert results == []
 
+    def test_partial_word(self, manager: ContentManager) -> None:
+        manager.add_text(title="技術選定", body="FastAPI を採用する", category="decision")
+        assert len(manager.search("fasta")) == 1
+        assert len(manager.search("i")) == 1
+
+    def test_search_after_add(self, manager: ContentManager) -> None:
+        manager.add_text(title="初回", body="内容", category="conversation")
+        assert manager.search("認証") == []
+        manager.add_text(title="認証方式", body="OAuth", category="decision")
+        results = manager.search("認証")
+        assert len(results) == 1
+        assert results[0]["title"] == "認証方式"
+
+    def test_large_body(self, manager: ContentManager) -> None:
+        body = "あ" * 70_000 + "末尾の認証メモ Token"
+        manager.add_text(title="大きな本文", body=body, category="reference")
+        assert len(manager.search("認証メモ")) == 1
+        assert len(manager.search("token")) == 1
+        assert len(manager.search("メモ TOKEN")) == 1
+        assert manager.search("存在しない語") == []
+
+    def test_large_body_not_kept_in_index(self, manager: ContentManager) -> None:
+        body = "あ" * 70_000 + "末尾の Ｔｏｋｅｎ"
+        manager.add_text(title="大きな本文", body=body, category="reference")
+        assert len(manager.search("ｔｏｋｅｎ")) == 1
+        assert all("body" not in entry for entry, _ in manager._indexed.values())
+
+    def test_cached_result(self, manager: ContentManager) -> None:
+        manager.add_text(title="キャッシュ検索", body="内容", category="conversation")
+        calls = []
+        original = manager._search_uncached
+        manager._search_uncached = lambda q: calls.append(q) or original(q)
+
+        first = manager.search("キャッシュ")
+        first.clear()
+        # 2回目はキャッシュから返り、呼び出し側の変更の影響も受けない
+        assert len(manager.search("キャッシュ")) == 1
+        assert len(calls) == 1
+
+    def test_cache_expires(self, manager: ContentManager) -> None:
+        manager._search_cache_ttl = 0
+        calls = []
+        original = manager._search_uncached
+        manager._search_uncached = lambda q: calls.append(q) or original(q)
+
+        manager.search("期限")
+        manager.search("期限")
+        assert len(calls) == 2
+
+
+class TestEntryCache:
+    """エントリキャッシュのテスト"""
+
+    def test_modified_file_is_reparsed(self, manager: ContentManager) -> None:
+        path = manager.add_text(title="変更前", body="内容", category="conversation")
+        assert manager.list_entries()[0]["title"] == "変更前"
+
+        path.write_text(
+            path.read_text(encoding="utf-8").replace("変更前", "変更後のタイトル"),
+            encoding="utf-8",
+        )
+        assert manager.list_entries()[0]["title"] == "変更後のタイトル"
+
+    def test_deleted_file_is_dropped(self, manager: ContentManager) -> None:
+        path = manager.add_text(title="削除対象", body="内容", category="conversation")
+        assert len(manager.list_entries()) == 1
+        path.unlink()
+        assert manager.list_entries() == []
+
+    def test_cache_persisted(self, manager: ContentManager, temp_project: Path) -> None:
+        manager.add_text(title="永続化", body="内容", category="conversation")
+        manager.list_entries()
+        manager.text_handler._entry_cache.save()
+        assert (temp_project / ".cache" / "text_entries.pkl").exists()
+
+        reloaded = ContentManager(base_dir=temp_project)
+        assert reloaded.list_entries()[0]["title"] == "永続化"
+
 
 class TestStats:
     """統計テスト"""
@@ -180,3 +439,38 @@ class TestStats:
         assert stats["text_count"] == 3
         assert stats["text_by_category"]["conversation"] == 2
         assert stats["text_by_category"]["decision"] == 1
+
+    def test_stats_with_images(self, manager: ContentManager, tmp_path: Path) -> None:
+        test_image = tmp_path / "stats.png"
+        test_image.write_bytes(b"\x89PNG\r\n\x1a\n")
+        manager.add_text(title="A", body="a", category="insight")
+        manager.add_image(title="図", image_path=str(test_image), category="diagram")
+        manager.add_image(title="図2", image_path=str(test_image), category="diagram")
+
+        stats = manager.get_stats()
+        assert stats["total"] == 3
+        assert stats["text_count"] == 1
+        assert stats["image_count"] == 2
+        assert stats["text_by_category"] == {"insight": 1}
+        assert stats["image_by_category"] == {"diagram": 2}
+
+
+class TestUpdateIndex:
+    """INDEX.md 生成テスト"""
+
+    def test_empty_index(self, manager: ContentManager) -> None:
+        content = manager.update_index().read_text(encoding="utf-8")
+        assert content.endswith("総エントリ数: 0\n")
+        assert "## テキスト" not in content
+
+    def test_index_sections(self, manager: ContentManager, tmp_path: Path) -> None:
+        test_image = tmp_path / "index.png"
+        test_image.write_bytes(b"\x89PNG\r\n\x1a\n")
+        manager.add_text(title="索引テスト", body="本文", tags=["x", "y"])
+        manager.add_image(title="索引画像", image_path=str(test_image))
+
+        content = manager.update_index().read_text(encoding="utf-8")
+        assert "総エントリ数: 2\n\n## テキスト\n\n- [索引テスト]" in content
+        assert "`x, y`" in content
+        assert "\n\n## 画像\n\n- [索引画像]" in content
+        assert content.endswith(")\n")
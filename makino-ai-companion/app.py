@@ -8,8 +8,8 @@ Usage:
 import logging
 import os
 from pathlib import Path
+from typing import Optional
 
-import yaml
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, RedirectResponse
@@ -19,11 +19,12 @@ from starlette.requests import Request
 
 from starlette.middleware.sessions import SessionMiddleware
 
-from src.api.routes import create_routes, router
+from src.api.routes import create_routes
 from src.auth.dependencies import get_optional_user
 from src.auth.oauth import create_auth_routes
 from src.chat.engine import ChatEngine
-from src.database.models import init_db
+from src.config_loader import load_config as _load_config
+from src.database.models import DEFAULT_POOL_SIZE, ConnectionPool, init_db
 from src.notifications.escalation_notifier import EscalationNotifier
 
 logging.basicConfig(
@@ -37,20 +38,17 @@ BASE_DIR = Path(__file__).parent
 
 def load_config() -> dict:
     """設定ファイルを読み込む。"""
-    config_path = BASE_DIR / "config" / "settings.yaml"
-    with open(config_path, encoding="utf-8") as f:
-        content = f.read()
+    return _load_config(BASE_DIR / "config" / "settings.yaml")
 
-    # 環境変数の展開
-    for key, value in os.environ.items():
-        content = content.replace(f"${{{key}}}", value)
 
-    return yaml.safe_load(content)
+def create_app(config: Optional[dict] = None) -> FastAPI:
+    """FastAPIアプリケーションを生成する。
 
-
-def create_app() -> FastAPI:
-    """FastAPIアプリケーションを生成する。"""
-    config = load_config()
+    Args:
+        config: 読み込み済みの設定。Noneの場合は settings.yaml から読み込む
+    """
+    if config is None:
+        config = load_config()
 
     app = FastAPI(
         title="牧野生保塾 AI伴走システム",
@@ -78,9 +76,11 @@ def create_app() -> FastAPI:
     templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 
     # データベース初期化
-    db_path = config.get("database", {}).get("sqlite", {}).get("path", "data/conversations.db")
-    db_conn = init_db(BASE_DIR / db_path)
-    logger.info(f"データベース初期化完了: {db_path}")
+    sqlite_config = config.get("database", {}).get("sqlite", {})
+    db_path = sqlite_config.get("path", "data/conversations.db")
+    init_db(BASE_DIR / db_path).close()
+    db_pool = ConnectionPool(BASE_DIR / db_path, size=sqlite_config.get("pool_size", DEFAULT_POOL_SIZE))
+    logger.info(f"データベース初期化完了: {db_path} (接続数={db_pool.size})")
 
     # チャットエンジン初期化
     claude_config = config.get("claude", {})
@@ -92,6 +92,7 @@ def create_app() -> FastAPI:
         knowledge_dir=str(BASE_DIR / config.get("rag", {}).get("knowledge_dir", "knowledge")),
         config_path=str(BASE_DIR / "config" / "settings.yaml"),
         max_tokens=claude_config.get("max_tokens", 4096),
+        semantic_cache=claude_config.get("semantic_cache"),
     )
 
     # 認証ルーティング
@@ -104,8 +105,8 @@ def create_app() -> FastAPI:
     notifier = EscalationNotifier(escalation_config)
 
     # APIルーティング設定
-    create_routes(engine, db_conn, notifier=notifier)
-    app.include_router(router)
+    api_router = create_routes(engine, db_pool, notifier=notifier)
+    app.include_router(api_router)
 
     # --- ページルーティング ---
 
@@ -144,12 +145,12 @@ def create_app() -> FastAPI:
     return app
 
 
-app = create_app()
+config = load_config()
+app = create_app(config)
 
 if __name__ == "__main__":
     import uvicorn
 
-    config = load_config()
     server_config = config.get("server", {})
 
     uvicorn.run(
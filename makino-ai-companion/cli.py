@@ -19,11 +19,10 @@ import json
 import logging
 import os
 import sys
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
 
-import yaml
-
 BASE_DIR = Path(__file__).parent
 sys.path.insert(0, str(BASE_DIR))
 
@@ -36,12 +35,9 @@ logger = logging.getLogger(__name__)
 
 def load_config() -> dict:
     """設定ファイルを読み込む。"""
-    config_path = BASE_DIR / "config" / "settings.yaml"
-    with open(config_path, encoding="utf-8") as f:
-        content = f.read()
-    for key, value in os.environ.items():
-        content = content.replace(f"${{{key}}}", value)
-    return yaml.safe_load(content)
+    from src.config_loader import load_config as _load_config
+
+    return _load_config(BASE_DIR / "config" / "settings.yaml")
 
 
 # ============================================================
@@ -58,32 +54,47 @@ def cmd_knowledge_stats(args: argparse.Namespace) -> None:
     chunks = loader.load_all()
 
     # カテゴリ別集計
-    categories: dict[str, int] = {}
-    sources: dict[str, int] = {}
-    for chunk in chunks:
-        categories[chunk.category] = categories.get(chunk.category, 0) + 1
-        sources[chunk.source_file] = sources.get(chunk.source_file, 0) + 1
+    categories = Counter(chunk.category for chunk in chunks)
+    sources = Counter(chunk.source_file for chunk in chunks)
 
     print(f"\n=== ナレッジベース統計 ===")
     print(f"総チャンク数: {len(chunks)}")
     print(f"ソースファイル数: {len(sources)}")
     print(f"\nカテゴリ別:")
-    for cat, count in sorted(categories.items(), key=lambda x: -x[1]):
+    for cat, count in categories.most_common():
         print(f"  {cat}: {count}チャンク")
     print(f"\nファイル別:")
-    for src, count in sorted(sources.items(), key=lambda x: -x[1])[:20]:
+    for src, count in sources.most_common(20):
         print(f"  {src}: {count}チャンク")
 
 
+def _has_min_content(path: Path, min_chars: int) -> bool:
+    """空白を除いて min_chars 文字以上の内容があるかを、先頭だけ読んで判定する。"""
+    with open(path, "rb") as f:
+        head = f.read(4096)
+        if len(head.decode("utf-8", errors="ignore").strip()) >= min_chars:
+            return True
+        if len(head) < 4096:
+            return False
+        # 先頭が空白ばかりの大きなファイルのみ全体を読む
+        head += f.read()
+    return len(head.decode("utf-8").strip()) >= min_chars
+
+
 def cmd_knowledge_validate(args: argparse.Namespace) -> None:
     """ナレッジベースのバリデーションを実行する。"""
-    from src.knowledge_base.processor import load_knowledge_csv, validate_knowledge_base
-
     config = load_config()
     knowledge_dir = BASE_DIR / config.get("rag", {}).get("knowledge_dir", "knowledge")
 
-    md_files = list(knowledge_dir.rglob("*.md"))
-    csv_files = list(knowledge_dir.rglob("*.csv"))
+    # 1回の走査で Markdown と CSV を振り分ける
+    md_files: list[Path] = []
+    csv_files: list[Path] = []
+    for dirpath, _, filenames in os.walk(knowledge_dir):
+        for name in filenames:
+            if name.endswith(".md"):
+                md_files.append(Path(dirpath, name))
+            elif name.endswith(".csv"):
+                csv_files.append(Path(dirpath, name))
 
     print(f"\n=== ナレッジベース検証 ===")
     print(f"Markdownファイル: {len(md_files)}件")
@@ -91,8 +102,7 @@ def cmd_knowledge_validate(args: argparse.Namespace) -> None:
 
     errors = 0
     for md_file in md_files:
-        content = md_file.read_text(encoding="utf-8")
-        if len(content.strip()) < 10:
+        if not _has_min_content(md_file, 10):
             print(f"  [WARN] 内容が少ない: {md_file}")
             errors += 1
 
@@ -172,8 +182,6 @@ def cmd_logs_metrics(args: argparse.Namespace) -> None:
 
 def cmd_prompt_test(args: argparse.Namespace) -> None:
     """プロンプトを対話的にテストする。"""
-    from src.chat.engine import ChatEngine
-
     config = load_config()
     claude_config = config.get("claude", {})
     api_key = claude_config.get("api_key", os.environ.get("ANTHROPIC_API_KEY", ""))
@@ -182,6 +190,9 @@ def cmd_prompt_test(args: argparse.Namespace) -> None:
         print("ANTHROPIC_API_KEY が設定されていません。")
         return
 
+    # Anthropic SDK やRAGを含むため、APIキーを確認してから読み込む
+    from src.chat.engine import ChatEngine
+
     engine = ChatEngine(
         api_key=api_key,
         model=claude_config.get("model", "claude-sonnet-4-5-20250929"),
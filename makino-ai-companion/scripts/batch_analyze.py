@@ -21,8 +21,7 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-import yaml
-
+from src.config_loader import load_config as _load_config
 from src.database.models import init_db
 from src.memory.batch_analyzer import BatchAnalyzer
 
@@ -35,12 +34,7 @@ logger = logging.getLogger(__name__)
 
 def load_config() -> dict:
     """設定ファイルを読み込む。"""
-    config_path = project_root / "config" / "settings.yaml"
-    with open(config_path, encoding="utf-8") as f:
-        content = f.read()
-    for key, value in os.environ.items():
-        content = content.replace(f"${{{key}}}", value)
-    return yaml.safe_load(content)
+    return _load_config(project_root / "config" / "settings.yaml")
 
 
 def main() -> None:
@@ -12,7 +12,6 @@ Usage:
 import argparse
 import json
 import logging
-import os
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -20,8 +19,7 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-import yaml
-
+from src.config_loader import load_config
 from src.database.models import get_connection
 from src.database.operations import (
     calculate_metrics,
@@ -64,12 +62,7 @@ def main() -> None:
     args = parser.parse_args()
 
     # 設定読み込み
-    config_path = project_root / "config" / "settings.yaml"
-    with open(config_path, encoding="utf-8") as f:
-        content = f.read()
-    for key, value in os.environ.items():
-        content = content.replace(f"${{{key}}}", value)
-    config = yaml.safe_load(content)
+    config = load_config(project_root / "config" / "settings.yaml")
 
     db_path = config.get("database", {}).get("sqlite", {}).get("path", "data/conversations.db")
 
@@ -8,32 +8,47 @@
     python scripts/knowledge_pipeline.py --type video       # 種別フィルタ
     python scripts/knowledge_pipeline.py --report latest    # 最新レポート表示
     python scripts/knowledge_pipeline.py --no-verify        # Pass3品質検証をスキップ
+    python scripts/knowledge_pipeline.py --resume           # 中断した実行を再開
 """
 
 import argparse
 import asyncio
+import hashlib
 import json
 import logging
+import multiprocessing
+import os
+import re
 import shutil
+import sqlite3
 import sys
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
+from functools import partial
 from pathlib import Path
+from typing import Optional
 
 # プロジェクトルートをパスに追加
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
-import yaml
+try:
+    import orjson
+except ImportError:  # 任意依存。なければ標準の json で書き出す
+    orjson = None
 
+from src.config_loader import load_config
 from src.knowledge_base.media_processor import (
-    ALL_EXTENSIONS,
     VIDEO_EXTENSIONS,
     AUDIO_EXTENSIONS,
     IMAGE_EXTENSIONS,
     TEXT_EXTENSIONS,
     PDF_EXTENSIONS,
     DOCX_EXTENSIONS,
-    classify_file,
+    classify_filename,
     process_file,
     ExtractedContent,
 )
@@ -51,24 +66,55 @@ logging.basicConfig(
 )
 logger = logging.getLogger("pipeline")
 
+# 出典名の推定: seminar_vol5_2024 → 牧野生保塾 Vol.5 (2024)
+_SOURCE_NAME_PATTERN = re.compile(r"(?:seminar|セミナー).*?vol\.?(\d+).*?(\d{4})", re.IGNORECASE)
+# ファイル名に使えない文字
+_UNSAFE_FILENAME_CHARS = re.compile(r'[\\/:*?"<>|]')
+
+# 内容ハッシュ計算時の読み込み単位
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _file_digest(path: Path) -> str:
+    """ファイル内容のハッシュ（BLAKE2b）を返す。"""
+    h = hashlib.blake2b()
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK_SIZE):
+            h.update(chunk)
+    return h.hexdigest()
+
 
 # =============================================================================
 # パイプラインレポート
 # =============================================================================
 
+@dataclass(slots=True)
 class PipelineReport:
-    """パイプライン実行結果のレポート。"""
-
-    def __init__(self) -> None:
-        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.started_at = datetime.now().isoformat()
-        self.completed_at = ""
-        self.input_files = 0
-        self.success: list[dict] = []
-        self.failed: list[dict] = []
-        self.skipped_duplicate: list[dict] = []
-        self.manual_review: list[dict] = []
-        self.stats: dict = {}
+    """パイプライン実行結果のレポート。
+
+    大量のファイルを処理する実行でも属性アクセスとインスタンスのメモリを抑えるため slots を使う。
+    """
+
+    run_id: str = ""
+    started_at: str = ""
+    completed_at: str = ""
+    input_files: int = 0
+    success: list[dict] = field(default_factory=list)
+    failed: list[dict] = field(default_factory=list)
+    skipped_duplicate: list[dict] = field(default_factory=list)
+    manual_review: list[dict] = field(default_factory=list)
+    stats: dict = field(default_factory=dict)
+    # 複数のワーカーからの途中保存を直列化し、古い内容で新しい内容を上書きしないための状態
+    _save_lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    _save_seq: int = field(default=0, repr=False, compare=False)
+    _saved_seq: int = field(default=0, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # 実行IDと開始時刻は同じ時刻から作る（別々に取ると日付の変わり目でずれうる）
+        if not self.run_id or not self.started_at:
+            now = datetime.now()
+            self.run_id = self.run_id or now.strftime("%Y%m%d_%H%M%S")
+            self.started_at = self.started_at or now.isoformat()
 
     def to_dict(self) -> dict:
         return {
@@ -84,15 +130,54 @@ class PipelineReport:
             },
             "files_created": self.success,
             "errors": self.failed,
+            "skipped_duplicate": self.skipped_duplicate,
             "manual_review": self.manual_review,
             "stats": self.stats,
         }
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "PipelineReport":
+        """保存済みレポート（チェックポイント）から復元する。"""
+        report = cls()
+        report.run_id = data["run_id"]
+        report.started_at = data.get("started_at", report.started_at)
+        report.input_files = data.get("input_files", 0)
+        report.success = data.get("files_created", [])
+        report.failed = data.get("errors", [])
+        report.skipped_duplicate = data.get("skipped_duplicate", [])
+        report.manual_review = data.get("manual_review", [])
+        return report
+
     def save(self, output_dir: Path) -> Path:
+        return self._write(output_dir, *self._snapshot())
+
+    async def save_async(self, output_dir: Path) -> Path:
+        """イベントループ上から保存する。シリアライズのみ同期で行い、書き込みはスレッドで行う。"""
+        return await asyncio.to_thread(self._write, output_dir, *self._snapshot())
+
+    def _snapshot(self) -> tuple[bytes, int]:
+        """現在の内容をシリアライズし、保存順を判定する通し番号と組にする。"""
+        self._save_seq += 1
+        return self._serialize(), self._save_seq
+
+    def _serialize(self) -> bytes:
+        # チェックポイントのたびに全件を書き出すため、orjson があれば使う
+        if orjson is not None:
+            return orjson.dumps(self.to_dict(), option=orjson.OPT_INDENT_2)
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2).encode("utf-8")
+
+    def _write(self, output_dir: Path, content: bytes, seq: int) -> Path:
+        """一時ファイルに書いてから置き換える（途中で落ちても壊れたJSONを残さない）。"""
         output_dir.mkdir(parents=True, exist_ok=True)
         path = output_dir / f"report_{self.run_id}.json"
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        with self._save_lock:
+            # 後からシリアライズした内容が先に書かれていれば、古い内容では上書きしない
+            if seq < self._saved_seq:
+                return path
+            tmp_path = path.with_name(path.name + ".tmp")
+            tmp_path.write_bytes(content)
+            os.replace(tmp_path, path)
+            self._saved_seq = seq
         return path
 
     def print_summary(self) -> None:
@@ -143,6 +228,7 @@ class KnowledgePipeline:
         file_type_filter: Optional[str] = None,
         verification_enabled: bool = True,
         whisper_model: str = "base",
+        resume: bool = False,
     ) -> None:
         self.project_root = project_root
         self.knowledge_dir = project_root / "knowledge"
@@ -152,17 +238,18 @@ class KnowledgePipeline:
         self.completed_dir = self.intake_dir / "completed"
         self.failed_dir = self.intake_dir / "failed"
         self.report_dir = project_root / "logs" / "pipeline"
+        self.workers = workers
         self.dry_run = dry_run
         self.file_type_filter = file_type_filter
         self.whisper_model = whisper_model
+        self.resume = resume
         self.image_tmp_dir = self.intake_dir / "tmp_images"
 
         # settings.yaml読み込み
         settings_path = project_root / "config" / "settings.yaml"
         self.settings: dict = {}
         if settings_path.exists():
-            with open(settings_path, encoding="utf-8") as f:
-                self.settings = yaml.safe_load(f) or {}
+            self.settings = load_config(settings_path) or {}
 
         # Claude分析エンジン
         self.analyzer = ContentAnalyzer(
@@ -171,6 +258,26 @@ class KnowledgePipeline:
             verification_enabled=verification_enabled,
         )
 
+        # メディア変換（PDF解析・文字起こし等のCPU処理）を回すプロセス数。
+        # イベントループ上で直接実行すると他ファイルの処理が止まるため別プロセスで行う
+        media_workers = self.settings.get("pipeline", {}).get("media_workers", 0)
+        self.media_workers = media_workers or min(workers, os.cpu_count() or 1)
+        # この件数を処理するごとにレポートを途中保存する（中断時に --resume で再開できるように）
+        self.checkpoint_interval = self.settings.get("pipeline", {}).get("checkpoint_interval", 25)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+        # intake 内の移動に使う関数。同一ファイルシステムなら rename 1回で済む os.replace、
+        # 入力ディレクトリが別デバイスの場合のみ shutil.move（_ensure_directories で判定）
+        self._rename = os.replace
+        # 作成済みの knowledge/ サブディレクトリ
+        self._output_dirs: set[Path] = set()
+
+        # 処理済みファイルの内容ハッシュ → 出力先。同じ内容の再投入をClaude分析の前に弾く
+        self.hash_db_path = self.intake_dir / ".hashes.db"
+        self._hash_db: Optional[sqlite3.Connection] = None
+        # 処理中のハッシュ（同じ内容のファイルが同時に投入された場合用）
+        self._pending_digests: set[str] = set()
+
         self.report = PipelineReport()
 
     async def run(self) -> PipelineReport:
@@ -180,32 +287,105 @@ class KnowledgePipeline:
         # ディレクトリ準備
         self._ensure_directories()
 
-        # Stage 1: ファイル検出
-        files = self._discover_files()
-        self.report.input_files = len(files)
-
-        if not files:
-            logger.info("処理対象ファイルがありません")
-            self.report.completed_at = datetime.now().isoformat()
-            return self.report
+        # 中断した実行の再開: 未完了の最新レポートを引き継ぎ、processing/ に残ったファイルも
+        # 処理し直す。引き継いだ場合、processing/ のファイルは前回の入力数に数え済み
+        resumed = self.resume and self._load_checkpoint()
 
-        logger.info(f"検出ファイル数: {len(files)}")
+        # Stage 1: ファイル検出
+        sources = [self.processing_dir, self.input_dir] if self.resume else [self.input_dir]
+        # processing/ と入力ディレクトリに同名のファイルがあれば先に見つけた方だけ処理する
+        # （processing/ への移動先が同じになるため）
+        seen_names: set[str] = set()
 
         if self.dry_run:
-            self._print_dry_run(files)
+            files = []
+            for directory in sources:
+                for f in self._discover_files(directory):
+                    if f[0].name in seen_names:
+                        continue
+                    seen_names.add(f[0].name)
+                    files.append(f)
+                    if not (resumed and directory == self.processing_dir):
+                        self.report.input_files += 1
+            if files:
+                self._print_dry_run(files)
+            else:
+                logger.info("処理対象ファイルがありません")
             self.report.completed_at = datetime.now().isoformat()
             return self.report
 
         # Stage 2-5: 並列処理
-        tasks = [self._process_single_file(f) for f in files]
-        await asyncio.gather(*tasks)
+        # ディレクトリを走査しながら、workers 個の処理タスクに上限付きキューで受け渡す。
+        # 全件の列挙・ソートを待たずに処理を始め、同時処理数（APIのレート制限・メモリ）も
+        # workers に抑える
+        queue: asyncio.Queue[Optional[Path]] = asyncio.Queue(maxsize=self.workers * 2)
+        processed = 0
+
+        async def worker() -> None:
+            nonlocal processed
+            while (file_path := await queue.get()) is not None:
+                # 想定外の例外でワーカーが止まると、キューが詰まって投入側が待ち続けるため、
+                # 1件ごとに捕捉して次のファイルへ進む
+                try:
+                    await self._process_single_file(file_path)
+                except Exception as e:
+                    logger.exception(f"処理中に予期しないエラー: {file_path.name}")
+                    self.report.failed.append({
+                        "source": file_path.name,
+                        "error": str(e),
+                        "moved_to": None,
+                    })
+                processed += 1
+                # 一定件数ごとにチェックポイントを保存する
+                if self.checkpoint_interval and processed % self.checkpoint_interval == 0:
+                    try:
+                        await self.report.save_async(self.report_dir)
+                    except Exception as e:
+                        logger.warning(f"チェックポイントを保存できません: {e}")
+
+        discovered = 0
+        self._hash_db = self._open_hash_db()
+        # ワーカープロセスは必要になってから起動され、その時点で asyncio.to_thread の
+        # スレッドが動いている。fork だとそれらが持つロック（logging・torch 等）を
+        # 握ったまま複製してデッドロックしうるため、spawn で起動する
+        with ProcessPoolExecutor(
+            max_workers=self.media_workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            self._pool = pool
+            workers = [asyncio.create_task(worker()) for _ in range(self.workers)]
+            try:
+                for directory in sources:
+                    for entry, _ in self._iter_files(directory):
+                        if entry.name in seen_names:
+                            logger.warning(f"同名のファイルを処理済みのため飛ばします: {entry.path}")
+                            continue
+                        seen_names.add(entry.name)
+                        discovered += 1
+                        if not (resumed and directory == self.processing_dir):
+                            self.report.input_files += 1
+                        await queue.put(Path(entry.path))
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
+            finally:
+                for task in workers:
+                    task.cancel()
+                self._pool = None
+                self._hash_db.close()
+                self._hash_db = None
+
+        if not discovered:
+            logger.info("処理対象ファイルがありません")
+            self.report.completed_at = datetime.now().isoformat()
+            return self.report
+        logger.info(f"処理ファイル数: {discovered}")
 
         # レポート集計
         self.report.completed_at = datetime.now().isoformat()
         self._compute_stats()
 
         # レポート保存・表示
-        report_path = self.report.save(self.report_dir)
+        report_path = await self.report.save_async(self.report_dir)
         logger.info(f"レポート保存: {report_path}")
         self.report.print_summary()
 
@@ -221,20 +401,75 @@ class KnowledgePipeline:
                   self.failed_dir, self.report_dir, self.image_tmp_dir]:
             d.mkdir(parents=True, exist_ok=True)
 
-    def _discover_files(self) -> list[Path]:
-        """入力ディレクトリからファイルを検出する。"""
-        if not self.input_dir.exists():
-            logger.warning(f"入力ディレクトリが存在しません: {self.input_dir}")
-            return []
+        if self.input_dir.stat().st_dev != self.processing_dir.stat().st_dev:
+            self._rename = shutil.move
+
+    async def _move(self, src: Path, dst: Path) -> None:
+        """ファイルを移動する。ブロッキングI/Oはスレッドで行いイベントループを止めない。"""
+        await asyncio.to_thread(self._rename, src, dst)
+
+    def _load_checkpoint(self) -> bool:
+        """最新のレポートが未完了なら読み込み、その実行の続きとしてレポートを引き継ぐ。
+
+        読めないレポートは飛ばす。最新の実行が完了済みなら新規に実行する。
+
+        Returns:
+            レポートを引き継いだか
+        """
+        for path in sorted(self.report_dir.glob("report_*.json"), reverse=True):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                report = PipelineReport.from_dict(data)
+            except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+                logger.warning(f"レポートを読み込めないため飛ばします: {path.name} ({e})")
+                continue
+            if data.get("completed_at"):
+                logger.info(f"最新の実行 {report.run_id} は完了済みのため、新規に実行します")
+                return False
+            self.report = report
+            logger.info(f"レポート {self.report.run_id} から再開します")
+            return True
+        logger.info("再開できるレポートがないため、新規に実行します")
+        return False
+
+    def _iter_files(self, directory: Path) -> Iterator[tuple[os.DirEntry, str]]:
+        """ディレクトリ内の処理対象ファイルを順不同で列挙する。
+
+        os.scandir の DirEntry がキャッシュする種別を使い、ファイルごとの stat を省く。
+
+        Args:
+            directory: 検出対象ディレクトリ
 
-        files: list[Path] = []
-        for f in sorted(self.input_dir.iterdir()):
-            if f.is_file() and f.suffix.lower() in ALL_EXTENSIONS:
-                file_type = classify_file(f)
+        Yields:
+            (DirEntry, ファイル種別)
+        """
+        if not directory.exists():
+            logger.warning(f"入力ディレクトリが存在しません: {directory}")
+            return
+
+        with os.scandir(directory) as it:
+            for entry in it:
+                if not entry.is_file():
+                    continue
+                file_type = classify_filename(entry.name)
+                if file_type is None:
+                    continue
                 if self.file_type_filter and not self._matches_filter(file_type):
                     continue
-                files.append(f)
-
+                yield entry, file_type
+
+    def _discover_files(self, directory: Path) -> list[tuple[Path, Optional[str], int]]:
+        """ディレクトリ内の処理対象ファイルを名前順に一覧する（ドライラン表示用）。
+
+        Returns:
+            (ファイルパス, ファイル種別, サイズ) のリスト
+        """
+        files = [
+            (Path(entry.path), file_type, entry.stat().st_size)
+            for entry, file_type in self._iter_files(directory)
+        ]
+        files.sort(key=lambda f: f[0].name)
         return files
 
     def _matches_filter(self, file_type: Optional[str]) -> bool:
@@ -251,33 +486,73 @@ class KnowledgePipeline:
         allowed = filter_map.get(self.file_type_filter, (self.file_type_filter,))
         return file_type in allowed
 
-    def _print_dry_run(self, files: list[Path]) -> None:
+    def _print_dry_run(self, files: list[tuple[Path, Optional[str], int]]) -> None:
         """ドライラン結果を表示する。"""
         print("\n" + "=" * 60)
         print("  ドライラン — 以下のファイルが処理対象です")
         print("=" * 60)
-        for f in files:
-            ft = classify_file(f)
-            size_kb = f.stat().st_size / 1024
+        for f, ft, size in files:
+            size_kb = size / 1024
             print(f"  [{ft:>6s}] {f.name:40s} ({size_kb:.1f} KB)")
         print(f"\n  合計: {len(files)} ファイル")
         print("=" * 60 + "\n")
 
+    def _open_hash_db(self) -> sqlite3.Connection:
+        """内容ハッシュの記録用DBを開く。"""
+        conn = sqlite3.connect(str(self.hash_db_path))
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS hashes (sha TEXT PRIMARY KEY, output_path TEXT NOT NULL)"
+        )
+        conn.commit()
+        return conn
+
+    def _find_processed(self, digest: str) -> Optional[str]:
+        """同じ内容のファイルの出力先を返す。未処理ならNone。"""
+        row = self._hash_db.execute(
+            "SELECT output_path FROM hashes WHERE sha = ?", (digest,)
+        ).fetchone()
+        return row[0] if row else None
+
     async def _process_single_file(self, file_path: Path) -> None:
         """1ファイルの全パイプラインを実行する。"""
         fname = file_path.name
         processing_path = self.processing_dir / fname
+        completed_path = self.completed_dir / fname
+        failed_path = self.failed_dir / fname
+        digest: Optional[str] = None
 
         try:
             # processing/ に移動（ロック）
-            shutil.move(str(file_path), str(processing_path))
+            await self._move(file_path, processing_path)
             logger.info(f"処理開始: {fname}")
 
-            # Stage 2: メディア変換
-            extracted = process_file(
-                processing_path,
-                image_output_dir=self.image_tmp_dir / file_path.stem,
-                whisper_model=self.whisper_model,
+            # 内容の重複チェック（変換・分析の前に行い、再投入分のAPI呼び出しを省く）
+            digest = await asyncio.to_thread(_file_digest, processing_path)
+            existing = self._find_processed(digest)
+            if existing is None and digest in self._pending_digests:
+                existing = "(同時に投入された同一内容のファイル)"
+            if existing is not None:
+                digest = None
+                self.report.skipped_duplicate.append({
+                    "source": fname,
+                    "output": existing,
+                    "reason": "同一内容のファイルを処理済み",
+                })
+                await self._move(processing_path, completed_path)
+                logger.warning(f"重複スキップ（内容一致）: {fname}")
+                return
+            self._pending_digests.add(digest)
+
+            # Stage 2: メディア変換（CPU処理のためプロセスプールで実行）
+            loop = asyncio.get_running_loop()
+            extracted = await loop.run_in_executor(
+                self._pool,
+                partial(
+                    process_file,
+                    processing_path,
+                    image_output_dir=self.image_tmp_dir / file_path.stem,
+                    whisper_model=self.whisper_model,
+                ),
             )
 
             if not extracted:
@@ -299,7 +574,9 @@ class KnowledgePipeline:
 
             # Stage 5: 検証・格納
             output_subdir = self.knowledge_dir / result.knowledge_dir
-            output_subdir.mkdir(parents=True, exist_ok=True)
+            if output_subdir not in self._output_dirs:
+                output_subdir.mkdir(parents=True, exist_ok=True)
+                self._output_dirs.add(output_subdir)
 
             # ファイル名生成
             safe_title = self._sanitize_filename(result.title or file_path.stem)
@@ -312,19 +589,28 @@ class KnowledgePipeline:
                     "output": str(output_path.relative_to(self.project_root)),
                     "reason": "同名ファイルが既に存在",
                 })
-                shutil.move(str(processing_path), str(self.completed_dir / fname))
+                await self._move(processing_path, completed_path)
                 logger.warning(f"重複スキップ: {fname}")
                 return
 
-            # Markdown書き込み
-            output_path.write_text(markdown, encoding="utf-8")
+            # Markdown書き込み（他ファイルのAPI呼び出しを止めないようスレッドで行う）。
+            # 改行はOSに関係なく LF に揃え、改行変換も省く
+            await asyncio.to_thread(
+                output_path.write_text, markdown, encoding="utf-8", newline="\n"
+            )
 
             # 完了処理
-            shutil.move(str(processing_path), str(self.completed_dir / fname))
+            await self._move(processing_path, completed_path)
+            output_rel = str(output_path.relative_to(self.project_root))
+            self._hash_db.execute(
+                "INSERT OR REPLACE INTO hashes (sha, output_path) VALUES (?, ?)",
+                (digest, output_rel),
+            )
+            self._hash_db.commit()
 
             record = {
                 "source": fname,
-                "output": str(output_path.relative_to(self.project_root)),
+                "output": output_rel,
                 "category": result.category,
                 "sub_category": result.sub_category,
                 "priority": result.priority,
@@ -346,30 +632,30 @@ class KnowledgePipeline:
             logger.error(f"失敗: {fname}: {e}")
             # failed/ に移動
             if processing_path.exists():
-                shutil.move(str(processing_path), str(self.failed_dir / fname))
+                await self._move(processing_path, failed_path)
             elif file_path.exists():
-                shutil.move(str(file_path), str(self.failed_dir / fname))
+                await self._move(file_path, failed_path)
             self.report.failed.append({
                 "source": fname,
                 "error": str(e),
                 "moved_to": f"intake/failed/{fname}",
             })
+        finally:
+            if digest is not None:
+                self._pending_digests.discard(digest)
 
     def _infer_source_name(self, file_path: Path) -> str:
         """ファイル名から出典名を推定する。"""
         stem = file_path.stem
-        # パターンマッチ: seminar_vol5_2024 → 牧野生保塾 Vol.5 (2024)
-        import re
-        match = re.match(r"(?:seminar|セミナー).*?vol\.?(\d+).*?(\d{4})", stem, re.IGNORECASE)
+        match = _SOURCE_NAME_PATTERN.match(stem)
         if match:
             return f"牧野生保塾 Vol.{match.group(1)} ({match.group(2)})"
         return file_path.name
 
     def _sanitize_filename(self, name: str) -> str:
         """ファイル名として安全な文字列に変換する。"""
-        import re
         # 使えない文字を除去
-        sanitized = re.sub(r'[\\/:*?"<>|]', "", name)
+        sanitized = _UNSAFE_FILENAME_CHARS.sub("", name)
         # 長すぎる場合は切り詰め
         if len(sanitized) > 50:
             sanitized = sanitized[:50]
@@ -380,7 +666,7 @@ class KnowledgePipeline:
         by_category: dict[str, int] = {}
         by_type: dict[str, int] = {}
 
-        for item in self.success:
+        for item in self.report.success:
             cat = item.get("category", "不明")
             by_category[cat] = by_category.get(cat, 0) + 1
             eid = item.get("entry_id", "")
@@ -417,20 +703,14 @@ def show_report(report_dir: Path, which: str = "latest") -> None:
             print(f"利用可能: {[r.stem.replace('report_', '') for r in reports[:10]]}")
             return
 
-    with open(target, encoding="utf-8") as f:
-        data = json.load(f)
-
-    print(json.dumps(data, ensure_ascii=False, indent=2))
+    # 保存時に整形済みのため、パースし直さずにそのまま表示する
+    print(target.read_text(encoding="utf-8"))
 
 
 # =============================================================================
 # エントリーポイント
 # =============================================================================
 
-# shutil.moveのために必要な型ヒント用
-from typing import Optional
-
-
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="牧野生保塾 ナレッジパイプライン",
@@ -443,6 +723,7 @@ def main() -> None:
   python scripts/knowledge_pipeline.py --workers 3      # 並列度3
   python scripts/knowledge_pipeline.py --type video     # 動画のみ
   python scripts/knowledge_pipeline.py --report latest  # レポート表示
+  python scripts/knowledge_pipeline.py --resume         # 中断した実行を再開
 """,
     )
     parser.add_argument("--input", type=str, help="入力ディレクトリ（デフォルト: intake/raw/）")
@@ -454,6 +735,8 @@ def main() -> None:
     parser.add_argument("--whisper-model", default="base",
                         choices=["tiny", "base", "small", "medium", "large"],
                         help="Whisperモデルサイズ（デフォルト: base）")
+    parser.add_argument("--resume", action="store_true",
+                        help="中断した前回の実行を最新レポートから再開")
     parser.add_argument("--report", nargs="?", const="latest",
                         help="レポート表示（latest or run_id）")
 
@@ -475,6 +758,7 @@ def main() -> None:
         file_type_filter=args.type,
         verification_enabled=not args.no_verify,
         whisper_model=args.whisper_model,
+        resume=args.resume,
     )
 
     asyncio.run(pipeline.run())
@@ -6,12 +6,15 @@ knowledge/ ディレクトリ内のMarkdownファイルを検証し、
 Usage:
     python scripts/setup_knowledge_base.py
     python scripts/setup_knowledge_base.py --validate-only
+    python scripts/setup_knowledge_base.py --skip-rag-test
     python scripts/setup_knowledge_base.py --knowledge-dir knowledge/
 """
 
 import argparse
 import logging
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 project_root = Path(__file__).parent.parent
@@ -25,6 +28,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# フロントマター検証で先頭から読み込むバイト数
+FRONTMATTER_HEAD_SIZE = 2048
+
+# フロントマターの必須フィールド
+REQUIRED_FIELDS = ("category",)
+
+# 検証はファイル読み込み待ちが主のため、スレッドで並列に行う
+VALIDATION_WORKERS = 16
+
 
 def validate_frontmatter(file_path: Path) -> list[str]:
     """Markdownファイルのフロントマターを検証する。
@@ -36,30 +48,68 @@ def validate_frontmatter(file_path: Path) -> list[str]:
         エラーメッセージのリスト（空ならOK）
     """
     errors = []
-    content = file_path.read_text(encoding="utf-8")
-
-    if not content.startswith("---"):
+    # 本文は検証に不要なため先頭だけ読む。終了マーカーが先頭に収まらない場合のみ全体を読む。
+    # マーカーもフィールド名もASCIIなので、デコードせずバイト列のまま調べる
+    with open(file_path, "rb") as f:
+        content = f.read(FRONTMATTER_HEAD_SIZE)
+    if len(content) == FRONTMATTER_HEAD_SIZE and content.count(b"---") < 2:
+        content = file_path.read_bytes()
+
+    if not content.startswith(b"---"):
         errors.append("YAMLフロントマターが見つかりません")
         return errors
 
-    parts = content.split("---", 2)
-    if len(parts) < 3:
+    end = content.find(b"---", 3)
+    if end < 0:
         errors.append("フロントマターの終了マーカー（---）が見つかりません")
         return errors
 
-    frontmatter = parts[1].strip()
+    frontmatter = content[3:end].strip()
     if not frontmatter:
         errors.append("フロントマターが空です")
         return errors
 
-    required_fields = ["category"]
-    for field in required_fields:
-        if f"{field}:" not in frontmatter:
+    for field in REQUIRED_FIELDS:
+        if field.encode("ascii") + b":" not in frontmatter:
             errors.append(f"必須フィールド '{field}' がフロントマターに含まれていません")
 
     return errors
 
 
+def scan_markdown_files(
+    knowledge_dir: Path,
+) -> tuple[list[Path], list[Path], dict[str, int]]:
+    """ナレッジディレクトリを1回だけ走査し、Markdownファイルを集める。
+
+    Args:
+        knowledge_dir: ナレッジベースディレクトリ
+
+    Returns:
+        (README を除くMarkdownファイルのリスト, READMEのリスト,
+         直下のサブディレクトリ名 → README を除くファイル数)
+    """
+    content_files: list[Path] = []
+    readme_files: list[Path] = []
+    subdir_counts: dict[str, int] = {}
+
+    for dirpath, dirnames, filenames in os.walk(knowledge_dir):
+        rel_parts = Path(dirpath).relative_to(knowledge_dir).parts
+        if not rel_parts:
+            # 直下のサブディレクトリはファイルがなくても 0件として表示する
+            subdir_counts.update(dict.fromkeys(dirnames, 0))
+        for name in filenames:
+            if not name.endswith(".md"):
+                continue
+            if name.lower() == "readme.md":
+                readme_files.append(Path(dirpath, name))
+                continue
+            content_files.append(Path(dirpath, name))
+            if rel_parts:
+                subdir_counts[rel_parts[0]] += 1
+
+    return content_files, readme_files, subdir_counts
+
+
 def main() -> None:
     """メイン処理。"""
     parser = argparse.ArgumentParser(
@@ -76,6 +126,11 @@ def main() -> None:
         action="store_true",
         help="バリデーションのみ実施",
     )
+    parser.add_argument(
+        "--skip-rag-test",
+        action="store_true",
+        help="RAGエンジンでの読み込みテスト（全ファイルの読み込み・チャンク分割）を省略",
+    )
     args = parser.parse_args()
 
     knowledge_dir = Path(args.knowledge_dir)
@@ -83,18 +138,18 @@ def main() -> None:
         logger.error(f"ディレクトリが見つかりません: {knowledge_dir}")
         sys.exit(1)
 
-    # Markdownファイルの一覧取得
-    md_files = list(knowledge_dir.rglob("*.md"))
-    readme_files = [f for f in md_files if f.name.lower() == "readme.md"]
-    content_files = [f for f in md_files if f.name.lower() != "readme.md"]
+    # Markdownファイルの一覧取得（サブディレクトリ別の件数も同じ走査で数える）
+    content_files, readme_files, subdir_counts = scan_markdown_files(knowledge_dir)
 
     logger.info(f"ナレッジベースディレクトリ: {knowledge_dir}")
     logger.info(f"Markdownファイル数: {len(content_files)} （README除く）")
 
     # バリデーション
     has_errors = False
-    for file_path in content_files:
-        errors = validate_frontmatter(file_path)
+    with ThreadPoolExecutor(max_workers=VALIDATION_WORKERS) as ex:
+        # map は入力順に結果を返すため、警告の出力順は従来どおり
+        results = list(ex.map(validate_frontmatter, content_files))
+    for file_path, errors in zip(content_files, results):
         if errors:
             has_errors = True
             for error in errors:
@@ -114,19 +169,19 @@ def main() -> None:
     logger.info("=== ナレッジベース統計 ===")
 
     # サブディレクトリ別の統計
-    subdirs = [d for d in knowledge_dir.iterdir() if d.is_dir()]
-    for subdir in sorted(subdirs):
-        files = list(subdir.rglob("*.md"))
-        content = [f for f in files if f.name.lower() != "readme.md"]
-        logger.info(f"  {subdir.name}/: {len(content)} ファイル")
-
-    # RAGエンジンでの読み込みテスト
-    try:
-        loader = KnowledgeLoader(str(knowledge_dir))
-        documents = loader.load_all()
-        logger.info(f"  RAG読み込みテスト: {len(documents)} チャンク生成")
-    except Exception as e:
-        logger.warning(f"  RAG読み込みテスト失敗: {e}")
+    for name, count in sorted(subdir_counts.items()):
+        logger.info(f"  {name}/: {count} ファイル")
+
+    # RAGエンジンでの読み込みテスト（走査済みのファイル一覧を渡し、再走査しない）
+    if args.skip_rag_test:
+        logger.info("  RAG読み込みテスト: スキップ")
+    else:
+        try:
+            loader = KnowledgeLoader(str(knowledge_dir))
+            documents = loader.load_all(content_files + readme_files)
+            logger.info(f"  RAG読み込みテスト: {len(documents)} チャンク生成")
+        except Exception as e:
+            logger.warning(f"  RAG読み込みテスト失敗: {e}")
 
     logger.info("セットアップ完了")
 
@@ -4,16 +4,27 @@
 フロントエンドのチャットUIおよび将来のウィジェット埋め込みから呼び出される。
 """
 
+import asyncio
 import json
 import logging
-from typing import Optional
+import random
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
 from pydantic import BaseModel, Field
 
+try:
+    import orjson
+except ImportError:  # 任意依存。なければ標準の json でパースする
+    orjson = None
+
 from src.auth.dependencies import AuthUser, get_current_user, require_admin
-from src.chat.engine import ChatEngine
+from src.chat.engine import ChatEngine, ChatResponse
 from src.notifications.escalation_notifier import EscalationEvent, EscalationNotifier
+from src.database.models import ConnectionPool
 from src.database.operations import (
     calculate_metrics,
     get_conversation_history,
@@ -23,11 +34,60 @@ from src.database.operations import (
     save_feedback,
     save_interaction_log,
 )
-from src.memory.profile_manager import load_profile_context
+from src.memory.profile_manager import load_profile_context, profile_cache
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+# 質問ナビのプロンプトで使うエージェントパターン名
+PATTERN_NAMES = {
+    1: "生命保険全般の質問対応",
+    2: "ドクターマーケット特化",
+    3: "法人保険特化",
+    4: "励まし・メンタリング",
+}
+
+# 質問ナビのサブトピック生成プロンプト
+GUIDE_SUGGESTIONS_PROMPT = """\
+あなたは生命保険営業のコンサルタントです。
+エージェントパターン「{pattern_name}」で、カテゴリ「{category}」に関して、
+営業担当者がよく質問するサブトピックを6つ、短いフレーズで列挙してください。
+各項目は簡潔に（10文字〜20文字程度）。
+JSON配列形式で出力してください。例: ["項目1", "項目2", ...]
+JSON配列のみを出力し、他のテキストは含めないでください。"""
+
+# 質問ナビのサブトピック生成時のClaude APIパラメータ
+GUIDE_SUGGESTIONS_PARAMS = {"max_tokens": 256, "temperature": 0.7}
+
+# 質問ナビのサブトピックを (パターン, カテゴリ) ごとに保持する件数
+GUIDE_SUGGESTIONS_CACHE_SIZE = 256
+# 質問ナビのサブトピックを保持する秒数（ナレッジ更新を1日以内に反映する）
+GUIDE_SUGGESTIONS_CACHE_TTL = 24 * 60 * 60
+# キャッシュがあっても生成し直す確率（候補が固定化しないように少しずつ入れ替える）
+GUIDE_SUGGESTIONS_REFRESH_RATE = 0.1
+
+
+def _parse_json_array(text: str) -> object:
+    """Claudeの出力からJSON配列部分を取り出してパースする。
+
+    指示に反してコードブロックや前置きの文が付いていても読めるよう、
+    最初の "[" から最後の "]" までを対象にする。
+
+    Args:
+        text: Claudeの出力テキスト
+
+    Returns:
+        パース結果
+
+    Raises:
+        ValueError: JSONとして読めない場合
+    """
+    start = text.find("[")
+    end = text.rfind("]")
+    if start >= 0 and end > start:
+        text = text[start:end + 1]
+    if orjson is not None:
+        return orjson.loads(text)  # orjson.JSONDecodeError は ValueError のサブクラス
+    return json.loads(text)
 
 
 # --- リクエスト/レスポンスモデル ---
@@ -106,23 +166,94 @@ class MetricsResponse(BaseModel):
 
 def create_routes(
     engine: ChatEngine,
-    db_conn,
+    db_pool: ConnectionPool,
     notifier: Optional[EscalationNotifier] = None,
 ) -> APIRouter:
     """ルーターを生成する。
 
     Args:
         engine: チャットエンジンインスタンス
-        db_conn: データベース接続
+        db_pool: データベース接続プール
         notifier: エスカレーション通知サービス（任意）
 
     Returns:
         設定済みAPIRouter
     """
+    # 呼び出しごとに新しいルーターを作り、同じエンドポイントが重複登録されないようにする
+    router = APIRouter()
+
+    async def run_db(func: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Any:
+        """プールから借りた接続を第1引数にしてDB操作をワーカースレッドで実行する。
+
+        イベントループを止めず、コミットや lastrowid も接続ごとに分かれる。
+        """
+        def call() -> Any:
+            with db_pool.acquire() as conn:
+                return func(conn, *args, **kwargs)
+        return await asyncio.to_thread(call)
+
+    # 質問ナビのサブトピック（LRU）。カテゴリは有限なので同じ生成を繰り返さない
+    # 値は (期限, サブトピック)。期限切れでも生成失敗時の予備として残す
+    suggestion_cache: OrderedDict[tuple[int, str], tuple[float, list[str]]] = OrderedDict()
+
+    async def record_followups(
+        conv_id: int,
+        session_id: str,
+        user_id: str,
+        request: ChatRequest,
+        response: ChatResponse,
+    ) -> None:
+        """応答の送信後に、操作ログとエスカレーションを保存して通知する。"""
+        # 操作ログとエスカレーションは conv_id だけに依存するので並行して保存する
+        pending = []
+        labels = []
+        if request.interaction:
+            ix = request.interaction
+            pending.append(run_db(
+                save_interaction_log,
+                conversation_id=conv_id,
+                user_id=user_id,
+                input_method=ix.input_method,
+                question_length=ix.question_length,
+                session_position=ix.session_position,
+                guide_category=ix.guide_category,
+                guide_sub_topic=ix.guide_sub_topic,
+                guide_steps_taken=ix.guide_steps_taken,
+                guide_backtrack=ix.guide_backtrack,
+                guide_ai_used=ix.guide_ai_used,
+                guide_freetext_len=ix.guide_freetext_len,
+                question_has_number=ix.question_has_number,
+                response_time_ms=ix.response_time_ms,
+            ))
+            labels.append("操作ログ保存失敗")
+        if response.should_escalate:
+            pending.append(run_db(save_escalation, conv_id, response.escalation_reason))
+            labels.append("エスカレーション保存失敗")
+
+        for label, result in zip(labels, await asyncio.gather(*pending, return_exceptions=True)):
+            if isinstance(result, Exception):
+                logger.warning(f"{label}: {result}")
+
+        # エスカレーション通知
+        if response.should_escalate and notifier:
+            try:
+                # 通知はSMTP/HTTPで同期的に送るためスレッドで行う
+                await asyncio.to_thread(notifier.notify, EscalationEvent(
+                    conversation_id=conv_id,
+                    session_id=session_id,
+                    user_id=user_id,
+                    question=request.question,
+                    reason=response.escalation_reason,
+                    confidence=response.confidence,
+                    category=response.category,
+                ))
+            except Exception as e:
+                logger.warning(f"エスカレーション通知失敗: {e}")
 
     @router.post("/api/chat", response_model=ChatResponseModel)
     async def chat(
         request: ChatRequest,
+        background_tasks: BackgroundTasks,
         user: AuthUser = Depends(get_current_user),
     ) -> ChatResponseModel:
         """チャットエンドポイント。質問を受け取り回答を返す。"""
@@ -130,22 +261,25 @@ def create_routes(
         user_id = user.user_id
 
         # 会話履歴取得
-        history = get_conversation_history(db_conn, session_id)
+        history = await run_db(get_conversation_history, session_id)
 
-        # ユーザープロファイルをロード
-        profile_context = load_profile_context(db_conn, user_id)
+        # ユーザープロファイルをロード（更新は週次バッチなので短時間キャッシュする）
+        hit, profile_context = profile_cache.get(user_id)
+        if not hit:
+            profile_context = await run_db(load_profile_context, user_id)
+            profile_cache.set(user_id, profile_context)
 
-        # 回答生成
-        response = engine.chat(
+        # 回答生成（Claude APIの応答待ちの間も他のリクエストを処理する）
+        response = await engine.achat(
             question=request.question,
             pattern=request.pattern,
             conversation_history=history,
             user_profile_context=profile_context,
         )
 
-        # DB保存
-        conv_id = save_conversation(
-            conn=db_conn,
+        # DB保存（書き込みはスレッドで行い、他のリクエストの処理を止めない）
+        conv_id = await run_db(
+            save_conversation,
             session_id=session_id,
             user_id=user_id,
             bot_pattern=f"pattern_{request.pattern}",
@@ -158,45 +292,10 @@ def create_routes(
             tokens_used=response.tokens_used,
         )
 
-        # 操作ログ保存
-        if request.interaction:
-            ix = request.interaction
-            try:
-                save_interaction_log(
-                    conn=db_conn,
-                    conversation_id=conv_id,
-                    user_id=user_id,
-                    input_method=ix.input_method,
-                    question_length=ix.question_length,
-                    session_position=ix.session_position,
-                    guide_category=ix.guide_category,
-                    guide_sub_topic=ix.guide_sub_topic,
-                    guide_steps_taken=ix.guide_steps_taken,
-                    guide_backtrack=ix.guide_backtrack,
-                    guide_ai_used=ix.guide_ai_used,
-                    guide_freetext_len=ix.guide_freetext_len,
-                    question_has_number=ix.question_has_number,
-                    response_time_ms=ix.response_time_ms,
-                )
-            except Exception as e:
-                logger.warning(f"操作ログ保存失敗: {e}")
-
-        # エスカレーション保存 + 通知
-        if response.should_escalate:
-            save_escalation(db_conn, conv_id, response.escalation_reason)
-            if notifier:
-                try:
-                    notifier.notify(EscalationEvent(
-                        conversation_id=conv_id,
-                        session_id=session_id,
-                        user_id=user_id,
-                        question=request.question,
-                        reason=response.escalation_reason,
-                        confidence=response.confidence,
-                        category=response.category,
-                    ))
-                except Exception as e:
-                    logger.warning(f"エスカレーション通知失敗: {e}")
+        # 操作ログ・エスカレーションの保存と通知は conv_id が決まれば応答後でよい
+        background_tasks.add_task(
+            record_followups, conv_id, session_id, user_id, request, response
+        )
 
         return ChatResponseModel(
             answer=response.answer,
@@ -213,8 +312,8 @@ def create_routes(
         user: AuthUser = Depends(get_current_user),
     ) -> dict:
         """フィードバックエンドポイント。ユーザー評価を記録する。"""
-        fb_id = save_feedback(
-            conn=db_conn,
+        fb_id = await run_db(
+            save_feedback,
             conversation_id=request.conversation_id,
             rating=request.rating,
             comment=request.comment,
@@ -228,7 +327,7 @@ def create_routes(
         admin: AuthUser = Depends(require_admin),
     ) -> MetricsResponse:
         """KPIメトリクスエンドポイント。"""
-        data = calculate_metrics(db_conn, date_from, date_to)
+        data = await run_db(calculate_metrics, date_from, date_to)
         return MetricsResponse(**data)
 
     @router.get("/api/metrics/patterns")
@@ -238,7 +337,7 @@ def create_routes(
         admin: AuthUser = Depends(require_admin),
     ) -> dict:
         """パターン別メトリクスエンドポイント。"""
-        return get_pattern_breakdown(db_conn, date_from, date_to)
+        return await run_db(get_pattern_breakdown, date_from, date_to)
 
     @router.post("/api/guide/suggestions", response_model=GuideSuggestionsResponse)
     async def guide_suggestions(
@@ -246,39 +345,52 @@ def create_routes(
         user: AuthUser = Depends(get_current_user),
     ) -> GuideSuggestionsResponse:
         """質問ナビ用のAI生成サブトピックを返す。"""
-        pattern_names = {
-            1: "生命保険全般の質問対応",
-            2: "ドクターマーケット特化",
-            3: "法人保険特化",
-            4: "励まし・メンタリング",
-        }
-        pattern_name = pattern_names.get(request.pattern, "汎用")
-
-        prompt = (
-            f"あなたは生命保険営業のコンサルタントです。\n"
-            f"エージェントパターン「{pattern_name}」で、"
-            f"カテゴリ「{request.category}」に関して、\n"
-            f"営業担当者がよく質問するサブトピックを6つ、短いフレーズで列挙してください。\n"
-            f"各項目は簡潔に（10文字〜20文字程度）。\n"
-            f"JSON配列形式で出力してください。例: [\"項目1\", \"項目2\", ...]\n"
-            f"JSON配列のみを出力し、他のテキストは含めないでください。"
+        key = (request.pattern, request.category)
+        entry = suggestion_cache.get(key)
+        cached = entry[1] if entry is not None else None
+        if (
+            entry is not None
+            and entry[0] > time.monotonic()
+            and random.random() >= GUIDE_SUGGESTIONS_REFRESH_RATE
+        ):
+            suggestion_cache.move_to_end(key)
+            return GuideSuggestionsResponse(suggestions=cached)
+
+        prompt = GUIDE_SUGGESTIONS_PROMPT.format(
+            pattern_name=PATTERN_NAMES.get(request.pattern, "汎用"),
+            category=request.category,
         )
 
         try:
-            response = engine.client.messages.create(
+            response = await engine.async_client.messages.create(
                 model=engine.model,
-                max_tokens=256,
                 messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
+                **GUIDE_SUGGESTIONS_PARAMS,
             )
             text = response.content[0].text.strip()
-            suggestions = json.loads(text)
+            suggestions = _parse_json_array(text)
             if isinstance(suggestions, list) and all(isinstance(s, str) for s in suggestions):
-                return GuideSuggestionsResponse(suggestions=suggestions[:8])
+                suggestions = suggestions[:8]
+                if suggestions:
+                    suggestion_cache[key] = (
+                        time.monotonic() + GUIDE_SUGGESTIONS_CACHE_TTL, suggestions
+                    )
+                    suggestion_cache.move_to_end(key)
+                    if len(suggestion_cache) > GUIDE_SUGGESTIONS_CACHE_SIZE:
+                        suggestion_cache.popitem(last=False)
+                return GuideSuggestionsResponse(suggestions=suggestions)
         except Exception as e:
             logger.warning(f"質問ナビAI生成エラー: {e}")
 
-        return GuideSuggestionsResponse(suggestions=[])
+        # 生成に失敗しても、以前の候補があればそれを返す
+        return GuideSuggestionsResponse(suggestions=cached or [])
+
+    @router.delete("/api/guide/suggestions/cache", dependencies=[Depends(require_admin)])
+    async def clear_guide_suggestions() -> dict:
+        """質問ナビのサブトピックキャッシュを破棄する（管理者のみ）。"""
+        cleared = len(suggestion_cache)
+        suggestion_cache.clear()
+        return {"status": "ok", "cleared": cleared}
 
     @router.get("/api/health")
     async def health() -> dict:
@@ -4,9 +4,9 @@
 """
 
 import logging
-from typing import Optional
+from typing import Annotated, Optional
 
-from fastapi import HTTPException, Request
+from fastapi import Depends, HTTPException, Request
 
 from src.auth.oauth import COOKIE_NAME, decode_jwt_token
 
@@ -66,12 +66,15 @@ async def get_optional_user(request: Request) -> Optional[AuthUser]:
     return AuthUser(payload)
 
 
-async def require_admin(request: Request) -> AuthUser:
+async def require_admin(
+    user: Annotated[AuthUser, Depends(get_current_user)],
+) -> AuthUser:
     """管理者権限を要求する。
 
+    ユーザーは get_current_user の依存として解決するため、同じリクエストで
+    他の依存関数が取得済みならFastAPIのキャッシュが使われる。
     管理者でない場合は 403 Forbidden を返す。
     """
-    user = await get_current_user(request)
     if not user.is_admin:
         raise HTTPException(status_code=403, detail="管理者権限が必要です")
     return user
@@ -6,6 +6,7 @@ JWT トークンでセッションを管理する。
 
 import logging
 import os
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
@@ -24,6 +25,14 @@ JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24
 COOKIE_NAME = "makino_session"
 
+# デコード済みトークンを保持する秒数（トークン自体の有効期限を超えては保持しない）
+JWT_CACHE_TTL = 60.0
+# デコード済みトークンを保持する件数
+JWT_CACHE_MAX_SIZE = 10000
+
+# トークン -> (キャッシュ期限のUNIX時刻, ペイロード)
+_jwt_cache: dict[str, tuple[float, dict]] = {}
+
 # OAuth クライアント（create_auth_routes で初期化）
 _oauth: Optional[OAuth] = None
 
@@ -48,15 +57,39 @@ def create_jwt_token(user_data: dict) -> str:
 def decode_jwt_token(token: str) -> Optional[dict]:
     """JWTトークンをデコードする。
 
+    認証付きの全リクエストで呼ばれるため、検証済みのトークンは
+    JWT_CACHE_TTL 秒（ただしトークンの exp まで）署名検証を省く。
+
     Returns:
         デコードされたペイロード。無効な場合はNone。
     """
+    now = time.time()
+    cached = _jwt_cache.get(token)
+    if cached is not None and cached[0] > now:
+        return dict(cached[1])
+
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        return payload
     except JWTError:
+        _jwt_cache.pop(token, None)
         return None
 
+    expires_at = now + JWT_CACHE_TTL
+    if isinstance(payload.get("exp"), (int, float)):
+        expires_at = min(expires_at, payload["exp"])
+    _cache_jwt_payload(token, expires_at, payload, now)
+    return dict(payload)
+
+
+def _cache_jwt_payload(token: str, expires_at: float, payload: dict, now: float) -> None:
+    """デコード結果をキャッシュする。満杯なら期限切れ、次に古いものから捨てる。"""
+    if token not in _jwt_cache and len(_jwt_cache) >= JWT_CACHE_MAX_SIZE:
+        for key in [k for k, (exp, _) in _jwt_cache.items() if exp <= now]:
+            del _jwt_cache[key]
+        if len(_jwt_cache) >= JWT_CACHE_MAX_SIZE:
+            del _jwt_cache[next(iter(_jwt_cache))]
+    _jwt_cache[token] = (expires_at, payload)
+
 
 def create_auth_routes(config: dict) -> APIRouter:
     """OAuth認証ルーターを生成する。
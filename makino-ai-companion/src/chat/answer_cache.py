@@ -0,0 +1,121 @@
+"""意味的に近い質問への回答キャッシュ。
+
+ベクトルRAGのクエリ埋め込みを使い、過去の質問とのコサイン類似度が
+閾値以上なら Claude API を呼ばずに前回の回答を返す。
+会話履歴やユーザープロファイルに依存しない初回の質問だけを対象にする。
+"""
+
+import logging
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from src.chat.engine import ChatResponse
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PatternEntries:
+    """1パターン分のキャッシュ。埋め込みは行列にまとめて1回の内積で比較する。"""
+
+    vectors: Optional[np.ndarray] = None
+    responses: list["ChatResponse"] = field(default_factory=list)
+    expires_at: list[float] = field(default_factory=list)
+
+
+class SemanticAnswerCache:
+    """パターン別に (質問埋め込み, 回答) を保持するキャッシュ。
+
+    埋め込みは正規化済み（EmbeddingModel.encode_query）である前提で、
+    内積をそのままコサイン類似度として扱う。max_entries はパターンごとの上限。
+    エスカレーション判定は呼び出し側でキャッシュを引く前に行うこと。
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        max_entries: int = 1000,
+        ttl_seconds: float = 24 * 60 * 60,
+    ) -> None:
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._patterns: dict[int, _PatternEntries] = {}
+
+    def lookup(self, query_vec: np.ndarray, pattern: int) -> Optional["ChatResponse"]:
+        """最も近い過去の質問が閾値以上なら、その回答を返す。
+
+        Args:
+            query_vec: 正規化済みのクエリ埋め込み
+            pattern: エージェントパターン番号
+
+        Returns:
+            キャッシュされた回答（tokens_used は 0）。該当なしなら None
+        """
+        entries = self._patterns.get(pattern)
+        if entries is None:
+            return None
+        # 期限切れの行は、より類似度の低い有効な行を隠さないよう先に捨てる
+        self._drop_oldest(entries, bisect_right(entries.expires_at, time.monotonic()))
+        if entries.vectors is None:
+            return None
+
+        scores = entries.vectors @ query_vec
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+
+        logger.debug(
+            f"回答キャッシュヒット: pattern={pattern}, 類似度={scores[best]:.3f}"
+        )
+        return replace(entries.responses[best], tokens_used=0)
+
+    def add(
+        self, query_vec: np.ndarray, pattern: int, response: "ChatResponse"
+    ) -> None:
+        """回答をキャッシュに追加する。上限を超えたら古いものから捨てる。
+
+        Args:
+            query_vec: 正規化済みのクエリ埋め込み
+            pattern: エージェントパターン番号
+            response: Claude API から得た回答。エスカレーション応答は保存しない
+        """
+        if getattr(response, "should_escalate", False):
+            return
+        entries = self._patterns.setdefault(pattern, _PatternEntries())
+        row = np.asarray(query_vec, dtype=np.float32).reshape(1, -1)
+        if entries.vectors is None:
+            entries.vectors = row
+        else:
+            entries.vectors = np.vstack([entries.vectors, row])
+        entries.responses.append(response)
+        entries.expires_at.append(time.monotonic() + self.ttl_seconds)
+
+        self._drop_oldest(entries, len(entries.responses) - self.max_entries)
+
+    @staticmethod
+    def _drop_oldest(entries: _PatternEntries, count: int) -> None:
+        """古いものから count 件を捨てる。
+
+        TTL は全件共通なので、expires_at は追加順に昇順で並ぶ。
+        期限切れの行は常に先頭にまとまっている。
+        """
+        if count <= 0:
+            return
+        if count >= len(entries.responses):
+            entries.vectors = None
+            entries.responses.clear()
+            entries.expires_at.clear()
+            return
+        entries.vectors = entries.vectors[count:]
+        del entries.responses[:count]
+        del entries.expires_at[:count]
+
+    def clear(self) -> None:
+        """全件を破棄する（ナレッジ更新時など）。"""
+        self._patterns.clear()
@@ -6,9 +6,10 @@ RAGで取得したナレッジコンテキストとシステムプロンプト
 """
 
 import logging
+import re
 import uuid
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any, ClassVar, Optional
 
 import anthropic
 
@@ -17,8 +18,34 @@ from src.chat.vector_rag import create_rag
 from src.prompts.system_prompts import build_system_prompt
 from src.prompts.persona_config import PersonaConfig, load_persona_config
 
+if TYPE_CHECKING:
+    from src.chat.answer_cache import SemanticAnswerCache
+
 logger = logging.getLogger(__name__)
 
+# 質問の簡易分類に使うキーワード。複数カテゴリに該当する場合は先に書いたものを優先する
+QUESTION_CATEGORIES = {
+    "法人保険": ["法人", "会社", "経営", "企業"],
+    "ドクターマーケット": ["ドクター", "医師", "医療", "開業医", "クリニック"],
+    "決算書分析": ["決算", "P/L", "B/S", "貸借", "損益"],
+    "退職金設計": ["退職金", "退職"],
+    "事業承継": ["承継", "後継者"],
+    "相続": ["相続", "遺産"],
+    "営業マインド": ["辛い", "落ち込", "やる気", "モチベ", "悩み"],
+}
+
+# キーワード -> カテゴリの優先順位
+_KEYWORD_RANK = {
+    word: rank
+    for rank, words in enumerate(QUESTION_CATEGORIES.values())
+    for word in words
+}
+_CATEGORY_NAMES = list(QUESTION_CATEGORIES)
+# 全キーワードを1回の走査で探す（長いものを先に並べ、「退職金」を「退職」より優先）
+_KEYWORD_PATTERN = re.compile(
+    "|".join(re.escape(w) for w in sorted(_KEYWORD_RANK, key=len, reverse=True))
+)
+
 
 @dataclass
 class ChatResponse:
@@ -33,6 +60,19 @@ class ChatResponse:
     category: str
 
 
+@dataclass
+class _PreparedChat:
+    """Claude API呼び出し前の準備結果。"""
+
+    search_results: list[SearchResult]
+    sources: list[str]
+    system_prompt: str
+    messages: list[dict]
+    pattern: int
+    # 回答キャッシュの対象なら質問の埋め込み
+    query_vec: Optional[Any] = None
+
+
 class ChatEngine:
     """Claude APIを使用したチャットエンジン。
 
@@ -49,13 +89,17 @@ class ChatEngine:
         max_tokens: int = 4096,
         vector_index_path: Optional[str] = None,
         use_vector_rag: bool = True,
+        semantic_cache: Optional[dict] = None,
     ) -> None:
         self.client = anthropic.Anthropic(api_key=api_key)
+        self._async_client: Optional[anthropic.AsyncAnthropic] = None
         self.model = model
         self.max_tokens = max_tokens
 
         # 人格設定
         self.persona = load_persona_config(config_path)
+        # パターン別のシステムプロンプト（人格設定は起動時に固定なので使い回す）
+        self._base_prompts: dict[int, str] = {}
 
         # ナレッジベース読み込み & RAGセットアップ
         loader = KnowledgeLoader(knowledge_dir)
@@ -66,19 +110,47 @@ class ChatEngine:
             use_vector=use_vector_rag,
         )
 
+        # 意味的回答キャッシュ（settings.yaml の claude.semantic_cache）。
+        # 質問の埋め込みが必要なため、ベクトルRAGのときだけ有効にする
+        self.answer_cache: Optional[SemanticAnswerCache] = None
+        cache_config = semantic_cache or {}
+        if cache_config.get("enabled") and hasattr(self.rag, "embedding"):
+            from src.chat import answer_cache
+
+            self.answer_cache = answer_cache.SemanticAnswerCache(
+                threshold=cache_config.get("threshold", 0.92),
+                max_entries=cache_config.get("max_entries", 1000),
+                ttl_seconds=cache_config.get("ttl_hours", 24) * 60 * 60,
+            )
+
         rag_type = type(self.rag).__name__
         logger.info(
             f"ChatEngine初期化完了: model={model}, "
             f"RAG={rag_type}, ナレッジ={len(chunks)}チャンク"
         )
 
+    @property
+    def async_client(self) -> anthropic.AsyncAnthropic:
+        """APIサーバー用の非同期クライアント。
+
+        CLIでは使わないため初回利用時に作成し、以後は接続プールごと使い回す。
+        """
+        if self._async_client is None:
+            self._async_client = anthropic.AsyncAnthropic(api_key=self.client.api_key)
+        return self._async_client
+
     # エスカレーション必須カテゴリ
-    ESCALATION_CATEGORIES = {
+    ESCALATION_CATEGORIES: ClassVar[set[str]] = {
         "コンプライアンス関連",
         "個別顧客の契約内容",
         "具体的な保険料試算",
         "税務の最終判断",
     }
+    # 判定に使う語（「関連」を除いたもの）-> カテゴリ。1回の走査でまとめて探す
+    _ESCALATION_KEYWORDS: ClassVar[dict[str, str]] = {c.replace("関連", ""): c for c in ESCALATION_CATEGORIES}
+    _ESCALATION_PATTERN = re.compile(
+        "|".join(re.escape(k) for k in sorted(_ESCALATION_KEYWORDS, key=len, reverse=True))
+    )
 
     def chat(
         self,
@@ -88,7 +160,7 @@ class ChatEngine:
         temperature: Optional[float] = None,
         user_profile_context: Optional[str] = None,
     ) -> ChatResponse:
-        """質問に対して回答を生成する。
+        """質問に対して回答を生成する（CLIなど同期処理用）。
 
         Args:
             question: ユーザーからの質問テキスト
@@ -100,8 +172,79 @@ class ChatEngine:
         Returns:
             ChatResponse
         """
+        prepared = self._prepare(question, pattern, conversation_history, user_profile_context)
+        if isinstance(prepared, ChatResponse):
+            return prepared
+
+        # Claude API呼び出し
+        try:
+            response = self.client.messages.create(
+                model=self.model,
+                max_tokens=self.max_tokens,
+                system=prepared.system_prompt,
+                messages=prepared.messages,
+                temperature=temperature,
+            )
+        except anthropic.APIError as e:
+            logger.error(f"Claude API エラー: {e}")
+            return self._error_response()
+
+        return self._build_response(question, prepared, response)
+
+    async def achat(
+        self,
+        question: str,
+        pattern: int = 1,
+        conversation_history: Optional[list[dict]] = None,
+        temperature: Optional[float] = None,
+        user_profile_context: Optional[str] = None,
+    ) -> ChatResponse:
+        """chat() の非同期版。APIサーバーから使う。
+
+        Claude APIの応答を待つ間もイベントループを止めず、他のリクエストを処理できる。
+        引数と戻り値は chat() と同じ。
+        """
+        prepared = self._prepare(question, pattern, conversation_history, user_profile_context)
+        if isinstance(prepared, ChatResponse):
+            return prepared
+
+        # Claude API呼び出し
+        try:
+            response = await self.async_client.messages.create(
+                model=self.model,
+                max_tokens=self.max_tokens,
+                system=prepared.system_prompt,
+                messages=prepared.messages,
+                temperature=temperature,
+            )
+        except anthropic.APIError as e:
+            logger.error(f"Claude API エラー: {e}")
+            return self._error_response()
+
+        return self._build_response(question, prepared, response)
+
+    def _prepare(
+        self,
+        question: str,
+        pattern: int,
+        conversation_history: Optional[list[dict]],
+        user_profile_context: Optional[str],
+    ) -> ChatResponse | _PreparedChat:
+        """RAG検索・エスカレーション判定・プロンプト構築を行う。
+
+        Returns:
+            エスカレーションする場合はその ChatResponse、それ以外は API 呼び出しの準備結果
+        """
+        # 履歴・プロファイルに依存しない質問は回答キャッシュの対象にする。
+        # 埋め込みはRAG検索と共用する
+        query_vec = None
+        search_kwargs: dict = {}
+        if self.answer_cache is not None and not conversation_history and not user_profile_context:
+            query_vec = self.rag.embedding.encode_query(question)
+            search_kwargs["query_vec"] = query_vec
+
         # RAG検索（パターン別フィルタリング）
-        search_results = self.rag.search(question, pattern=pattern)
+        search_results = self.rag.search(question, pattern=pattern, **search_kwargs)
         context = self.rag.format_context(search_results)
         sources = self.rag.get_sources(search_results)
 
@@ -124,9 +267,17 @@ class ChatEngine:
                 category=self._classify_question(question),
             )
 
+        # エスカレーション不要と判定した後でだけ、意味的に近い過去の回答を使う
+        if query_vec is not None:
+            cached = self.answer_cache.lookup(query_vec, pattern)
+            if cached is not None:
+                return replace(cached, category=self._classify_question(question))
+
         # システムプロンプト構築
-        system_prompt = build_system_prompt(pattern, self.persona)
-        system_prompt += f"\n\n## 参照ナレッジ\n{context}"
+        base_prompt = self._base_prompts.get(pattern)
+        if base_prompt is None:
+            base_prompt = self._base_prompts[pattern] = build_system_prompt(pattern, self.persona)
+        system_prompt = f"{base_prompt}\n\n## 参照ナレッジ\n{context}"
 
         # ユーザープロファイル注入（パーソナライズ）
         if user_profile_context:
@@ -140,45 +291,54 @@ class ChatEngine:
                 messages.append({"role": "assistant", "content": entry["answer"]})
         messages.append({"role": "user", "content": question})
 
-        # Claude API呼び出し
-        try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                system=system_prompt,
-                messages=messages,
-                temperature=temperature,
-            )
-
-            answer = response.content[0].text
-            tokens_used = (
-                response.usage.input_tokens + response.usage.output_tokens
-            )
+        return _PreparedChat(
+            search_results=search_results,
+            sources=sources,
+            system_prompt=system_prompt,
+            messages=messages,
+            pattern=pattern,
+            query_vec=query_vec,
+        )
 
-        except anthropic.APIError as e:
-            logger.error(f"Claude API エラー: {e}")
-            return ChatResponse(
-                answer="申し訳ありません。一時的にシステムに問題が発生しております。しばらく経ってから再度お試しください。",
-                sources=[],
-                confidence=0.0,
-                should_escalate=False,
-                escalation_reason="",
-                tokens_used=0,
-                category="システムエラー",
-            )
+    def _build_response(
+        self,
+        question: str,
+        prepared: _PreparedChat,
+        response: anthropic.types.Message,
+    ) -> ChatResponse:
+        """Claude APIの応答から ChatResponse を組み立てる。"""
+        answer = response.content[0].text
+        tokens_used = (
+            response.usage.input_tokens + response.usage.output_tokens
+        )
 
         # 確信度の推定（RAG検索結果のスコアベース）
-        confidence = self._estimate_confidence(search_results)
+        confidence = self._estimate_confidence(prepared.search_results)
 
-        return ChatResponse(
+        chat_response = ChatResponse(
             answer=answer,
-            sources=sources,
+            sources=prepared.sources,
             confidence=confidence,
             should_escalate=False,
             escalation_reason="",
             tokens_used=tokens_used,
             category=self._classify_question(question),
         )
+        if prepared.query_vec is not None:
+            self.answer_cache.add(prepared.query_vec, prepared.pattern, chat_response)
+        return chat_response
+
+    def _error_response(self) -> ChatResponse:
+        """Claude APIエラー時の応答。"""
+        return ChatResponse(
+            answer="申し訳ありません。一時的にシステムに問題が発生しております。しばらく経ってから再度お試しください。",
+            sources=[],
+            confidence=0.0,
+            should_escalate=False,
+            escalation_reason="",
+            tokens_used=0,
+            category="システムエラー",
+        )
 
     def _check_escalation(
         self,
@@ -187,9 +347,9 @@ class ChatEngine:
     ) -> tuple[bool, str]:
         """エスカレーション要否を判定する。"""
         # カテゴリベースの強制エスカレーション
-        for cat in self.ESCALATION_CATEGORIES:
-            if cat.replace("関連", "") in question:
-                return True, f"強制エスカレーションカテゴリ: {cat}"
+        m = self._ESCALATION_PATTERN.search(question)
+        if m:
+            return True, f"強制エスカレーションカテゴリ: {self._ESCALATION_KEYWORDS[m.group()]}"
 
         # 検索結果なし（ナレッジ不足）
         if not search_results:
@@ -211,19 +371,14 @@ class ChatEngine:
 
     def _classify_question(self, question: str) -> str:
         """質問を簡易分類する。"""
-        keywords = {
-            "法人保険": ["法人", "会社", "経営", "企業"],
-            "ドクターマーケット": ["ドクター", "医師", "医療", "開業医", "クリニック"],
-            "決算書分析": ["決算", "P/L", "B/S", "貸借", "損益"],
-            "退職金設計": ["退職金", "退職"],
-            "事業承継": ["承継", "後継者"],
-            "相続": ["相続", "遺産"],
-            "営業マインド": ["辛い", "落ち込", "やる気", "モチベ", "悩み"],
-        }
-        for category, words in keywords.items():
-            if any(w in question for w in words):
-                return category
-        return "一般"
+        best: Optional[int] = None
+        for m in _KEYWORD_PATTERN.finditer(question):
+            rank = _KEYWORD_RANK[m.group()]
+            if best is None or rank < best:
+                best = rank
+                if best == 0:
+                    break
+        return _CATEGORY_NAMES[best] if best is not None else "一般"
 
     def generate_session_id(self) -> str:
         """新しいセッションIDを生成する。"""
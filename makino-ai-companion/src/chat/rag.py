@@ -38,6 +38,11 @@ DIR_TO_CATEGORY: dict[str, str] = {
     "shared": "共通",
 }
 
+# YAMLフロントマター（ファイル先頭の --- で囲まれた部分）
+_FRONTMATTER_PATTERN = re.compile(r'^---\n(.*?)\n---', re.DOTALL)
+# セクション区切り（h1〜h3 見出しの直前の改行）
+_SECTION_BOUNDARY = re.compile(r'\n(?=#{1,3}\s)')
+
 
 @dataclass
 class KnowledgeChunk:
@@ -71,15 +76,26 @@ class KnowledgeLoader:
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
 
-    def load_all(self) -> list[KnowledgeChunk]:
-        """ナレッジディレクトリ内の全Markdownファイルを読み込む。"""
+    def load_all(self, files: Optional[list[Path]] = None) -> list[KnowledgeChunk]:
+        """ナレッジディレクトリ内の全Markdownファイルを読み込む。
+
+        Args:
+            files: 読み込むファイルのリスト。呼び出し側で走査済みの場合に渡すと、
+                ディレクトリを再走査しない（省略時は配下の全 *.md）
+
+        Returns:
+            チャンクのリスト
+        """
         chunks: list[KnowledgeChunk] = []
 
         if not self.knowledge_dir.exists():
             logger.warning(f"ナレッジディレクトリが存在しません: {self.knowledge_dir}")
             return chunks
 
-        for md_file in self.knowledge_dir.rglob("*.md"):
+        if files is None:
+            files = list(self.knowledge_dir.rglob("*.md"))
+
+        for md_file in files:
             file_chunks = self._load_file(md_file)
             chunks.extend(file_chunks)
 
@@ -117,7 +133,10 @@ class KnowledgeLoader:
 
     def _split_by_sections(self, content: str) -> list[str]:
         """Markdown見出しでセクション分割する。"""
-        sections = re.split(r'\n(?=#{1,3}\s)', content)
+        # 行頭の見出しがなければ正規表現を通さずに1セクションとして扱う
+        if "\n#" not in content:
+            return [content] if content.strip() else []
+        sections = _SECTION_BOUNDARY.split(content)
         return [s for s in sections if s.strip()]
 
     def _chunk_text(self, text: str) -> list[str]:
@@ -140,7 +159,7 @@ class KnowledgeLoader:
     def _extract_metadata(self, content: str) -> dict:
         """Markdownのフロントマター（YAML）からメタデータを抽出する。"""
         metadata: dict = {}
-        match = re.match(r'^---\n(.*?)\n---', content, re.DOTALL)
+        match = _FRONTMATTER_PATTERN.match(content)
         if match:
             for line in match.group(1).split('\n'):
                 if ':' in line:
@@ -171,6 +171,7 @@ class VectorRAG:
         query: str,
         top_k: int = 5,
         pattern: Optional[int] = None,
+        query_vec: Optional[np.ndarray] = None,
     ) -> list[SearchResult]:
         """ベクトル類似度でチャンクを検索する。
 
@@ -178,6 +179,7 @@ class VectorRAG:
             query: 検索クエリ文字列
             top_k: 返却する最大件数
             pattern: パターン番号でフィルタ（Noneなら全検索）
+            query_vec: 計算済みのクエリ埋め込み（省略時は query から計算する）
 
         Returns:
             類似度降順にソートされた SearchResult リスト
@@ -185,7 +187,8 @@ class VectorRAG:
         if self.index is None or self.index.ntotal == 0:
             return []
 
-        query_vec = self.embedding.encode_query(query)
+        if query_vec is None:
+            query_vec = self.embedding.encode_query(query)
         query_vec = np.array([query_vec], dtype=np.float32)
 
         # パターンフィルタ時は多めに取得してからフィルタ
@@ -0,0 +1,102 @@
+"""設定ファイル（settings.yaml）を読み込むモジュール。
+
+app.py / cli.py / scripts から共通で使う。
+YAMLのパース結果はファイルの (mtime_ns, size) をキーに pickle で保存し、
+CLI の起動ごとに PyYAML でパースし直さずに済ませる。
+キャッシュが有効なら PyYAML の import も省く。
+環境変数 ${ENV_VAR} の展開はパース後に行うため、キャッシュに秘密情報は書き込まれない。
+"""
+
+import logging
+import os
+import pickle
+import re
+import struct
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# ${ENV_VAR} 形式の参照
+_ENV_PATTERN = re.compile(r"\$\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+# キャッシュ先頭の16バイト: YAMLファイルの (mtime_ns, size)
+_CACHE_KEY = struct.Struct("<qq")
+
+
+def load_config(config_path: Path) -> dict:
+    """設定ファイルを読み込み、環境変数の参照を展開する。
+
+    Args:
+        config_path: settings.yaml のパス
+
+    Returns:
+        設定の辞書。未定義の環境変数は ${ENV_VAR} のまま残る
+    """
+    return _expand_env(load_yaml_cached(config_path))
+
+
+def load_yaml_cached(path: Path) -> Any:
+    """YAMLファイルを読み込む。変更がなければ前回のパース結果を使う。
+
+    パース結果は同じディレクトリの "<ファイル名>.pkl" に保存する。
+
+    Args:
+        path: YAMLファイルのパス
+
+    Returns:
+        パース結果
+    """
+    st = path.stat()
+    key = _CACHE_KEY.pack(st.st_mtime_ns, st.st_size)
+    cache_path = path.with_name(path.name + ".pkl")
+
+    try:
+        with open(cache_path, "rb") as f:
+            if f.read(_CACHE_KEY.size) == key:
+                return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        pass
+
+    data = _parse_yaml(path)
+
+    try:
+        tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(key)
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        # キャッシュは高速化のためだけなので、書けなくても読み込みは続行する
+        logger.debug(f"設定キャッシュを書き込めません: {cache_path} ({e})")
+
+    return data
+
+
+def _parse_yaml(path: Path) -> Any:
+    """YAMLファイルをパースする。
+
+    キャッシュが有効な間は PyYAML 自体を import しないよう、ここで読み込む。
+    """
+    import yaml
+
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:  # libyaml なしでビルドされた PyYAML
+        from yaml import SafeLoader
+
+    with open(path, encoding="utf-8") as f:
+        return yaml.load(f, Loader=SafeLoader)
+
+
+def _expand_env(value: Any) -> Any:
+    """パース済みの値に含まれる ${ENV_VAR} を環境変数の値で置き換える。"""
+    if isinstance(value, str):
+        if "${" not in value:
+            return value
+        return _ENV_PATTERN.sub(lambda m: os.environ.get(m.group(1), m.group(0)), value)
+    if isinstance(value, dict):
+        return {k: _expand_env(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_expand_env(v) for v in value]
+    return value
@@ -4,7 +4,10 @@
 SQLiteを採用し、定期的にGitHubへCSVエクスポートして監査性を担保する。
 """
 
+import queue
 import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -101,6 +104,9 @@ CREATE INDEX IF NOT EXISTS idx_conversations_session ON conversations(session_id
 CREATE INDEX IF NOT EXISTS idx_conversations_user ON conversations(user_id);
 CREATE INDEX IF NOT EXISTS idx_conversations_pattern ON conversations(bot_pattern);
 CREATE INDEX IF NOT EXISTS idx_conversations_timestamp ON conversations(timestamp);
+-- KPI集計（期間指定 + パターン別）をテーブル本体を読まずに索引だけで完結させる
+CREATE INDEX IF NOT EXISTS idx_conversations_timestamp_pattern
+    ON conversations(timestamp, bot_pattern, confidence, escalated);
 CREATE INDEX IF NOT EXISTS idx_feedback_conversation ON feedback(conversation_id);
 CREATE INDEX IF NOT EXISTS idx_escalations_status ON escalations(status);
 CREATE INDEX IF NOT EXISTS idx_interaction_logs_user ON interaction_logs(user_id);
@@ -110,6 +116,22 @@ CREATE INDEX IF NOT EXISTS idx_collective_insights_period ON collective_insights
 CREATE INDEX IF NOT EXISTS idx_collective_insights_type ON collective_insights(insight_type);
 """
 
+# 接続ごとに適用するPRAGMA。
+# WAL + synchronous=NORMAL でアプリの書き込み中もエクスポート等の読み取りが待たされず、
+# 大きめのページキャッシュと mmap で集計時の全件走査を速くする
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",  # 256 MiB
+    "PRAGMA cache_size=-65536",  # 64 MiB（負値はKiB単位）
+    "PRAGMA busy_timeout=5000",
+)
+
+# APIサーバーの接続プールの既定サイズ
+DEFAULT_POOL_SIZE = 4
+
 
 def init_db(db_path: str | Path) -> sqlite3.Connection:
     """データベースを初期化し、スキーマを適用する。
@@ -123,10 +145,7 @@ def init_db(db_path: str | Path) -> sqlite3.Connection:
     db_path = Path(db_path)
     db_path.parent.mkdir(parents=True, exist_ok=True)
 
-    conn = sqlite3.connect(str(db_path))
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA foreign_keys=ON")
+    conn = _connect(db_path)
     conn.executescript(DB_SCHEMA)
     conn.commit()
 
@@ -142,7 +161,59 @@ def get_connection(db_path: str | Path) -> sqlite3.Connection:
     Returns:
         データベース接続
     """
-    conn = sqlite3.connect(str(db_path))
+    return _connect(db_path)
+
+
+def _connect(db_path: str | Path) -> sqlite3.Connection:
+    """接続を開き、行ファクトリとPRAGMAを設定する。
+
+    APIサーバーはイベントループを止めないようワーカースレッドから接続を使うため、
+    作成スレッド以外からの利用を許可する（同時に使うのは1スレッドだけにすること）。
+    """
+    conn = sqlite3.connect(str(db_path), check_same_thread=False)
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys=ON")
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
     return conn
+
+
+class ConnectionPool:
+    """スレッドから使うSQLite接続のプール。
+
+    WALモードでは読み取りは並行して行え、書き込みは busy_timeout の範囲で
+    順番待ちになる。1本の接続を全リクエストで共有するのと違い、
+    履歴やメトリクスの読み取りが他のリクエストの書き込みに待たされない。
+    """
+
+    def __init__(self, db_path: str | Path, size: int = DEFAULT_POOL_SIZE) -> None:
+        # スキーマは init_db で適用済みであること
+        self._connections = [_connect(db_path) for _ in range(max(size, 1))]
+        self._idle: queue.SimpleQueue[sqlite3.Connection] = queue.SimpleQueue()
+        for conn in self._connections:
+            self._idle.put(conn)
+
+    @property
+    def size(self) -> int:
+        """接続数。"""
+        return len(self._connections)
+
+    @contextmanager
+    def acquire(self) -> Iterator[sqlite3.Connection]:
+        """接続を1本借りる。空きがなければ返却されるまで待つ。
+
+        Yields:
+            データベース接続
+        """
+        conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            # 途中で例外になった書き込みを次の利用者に持ち越さない
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        """全接続を閉じる。"""
+        for conn in self._connections:
+            conn.close()
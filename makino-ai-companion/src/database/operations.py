@@ -11,6 +11,10 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+# CSVエクスポート時に1回で取り出す行数と、書き込みバッファのサイズ
+EXPORT_BATCH_SIZE = 10_000
+EXPORT_BUFFER_SIZE = 1024 * 1024
+
 
 def save_conversation(
     conn: sqlite3.Connection,
@@ -395,22 +399,30 @@ def export_to_csv(
         where += " AND c.timestamp <= ?"
         params.append(date_to)
 
-    rows = conn.execute(
+    cursor = conn.execute(
         f"""SELECT c.*, f.rating as user_rating, f.comment as feedback_comment
            FROM conversations c
            LEFT JOIN feedback f ON c.id = f.conversation_id
            {where}
            ORDER BY c.timestamp""",
         params,
-    ).fetchall()
+    )
 
-    if not rows:
+    # 全件を一度に読み込まず、一定件数ずつ取り出して書き出す
+    cursor.arraysize = EXPORT_BATCH_SIZE
+    batch = cursor.fetchmany()
+    if not batch:
         return 0
 
-    with open(output_path, "w", encoding="utf-8", newline="") as f:
+    count = 0
+    with open(
+        output_path, "w", encoding="utf-8", newline="", buffering=EXPORT_BUFFER_SIZE
+    ) as f:
         writer = csv.writer(f)
-        writer.writerow(rows[0].keys())
-        for row in rows:
-            writer.writerow(tuple(row))
+        writer.writerow(col[0] for col in cursor.description)
+        while batch:
+            writer.writerows(batch)
+            count += len(batch)
+            batch = cursor.fetchmany()
 
-    return len(rows)
+    return count
@@ -6,6 +6,7 @@ PDF, DOCX, 動画, 音声, 画像ファイルからテキストを抽出する
 
 import base64
 import logging
+import os
 import shutil
 import subprocess
 import tempfile
@@ -23,11 +24,21 @@ VIDEO_EXTENSIONS = {".mp4", ".mov", ".avi", ".mkv", ".wmv"}
 AUDIO_EXTENSIONS = {".mp3", ".wav", ".m4a", ".aac", ".ogg", ".flac"}
 IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp"}
 
-ALL_EXTENSIONS = (
+ALL_EXTENSIONS = frozenset(
     TEXT_EXTENSIONS | PDF_EXTENSIONS | DOCX_EXTENSIONS
     | VIDEO_EXTENSIONS | AUDIO_EXTENSIONS | IMAGE_EXTENSIONS
 )
 
+# 拡張子 → 種別（classify_file を1回の辞書引きで済ませる）
+_FILE_TYPES = {
+    **dict.fromkeys(TEXT_EXTENSIONS, "text"),
+    **dict.fromkeys(PDF_EXTENSIONS, "pdf"),
+    **dict.fromkeys(DOCX_EXTENSIONS, "docx"),
+    **dict.fromkeys(VIDEO_EXTENSIONS, "video"),
+    **dict.fromkeys(AUDIO_EXTENSIONS, "audio"),
+    **dict.fromkeys(IMAGE_EXTENSIONS, "image"),
+}
+
 
 @dataclass
 class ExtractedContent:
@@ -46,20 +57,23 @@ def classify_file(file_path: Path) -> Optional[str]:
     Returns:
         "text", "pdf", "docx", "video", "audio", "image", or None
     """
-    suffix = file_path.suffix.lower()
-    if suffix in TEXT_EXTENSIONS:
-        return "text"
-    if suffix in PDF_EXTENSIONS:
-        return "pdf"
-    if suffix in DOCX_EXTENSIONS:
-        return "docx"
-    if suffix in VIDEO_EXTENSIONS:
-        return "video"
-    if suffix in AUDIO_EXTENSIONS:
-        return "audio"
-    if suffix in IMAGE_EXTENSIONS:
-        return "image"
-    return None
+    return classify_filename(file_path.name)
+
+
+def classify_filename(name: str) -> Optional[str]:
+    """ファイル名（パスを含まない）から種別を判定する。
+
+    ディレクトリ走査中に Path を組み立てずに判定するために使う。
+
+    Returns:
+        "text", "pdf", "docx", "video", "audio", "image", or None
+    """
+    suffix = os.path.splitext(name)[1]
+    # 小文字の拡張子がほとんどのため、まずそのまま引き、外れた場合のみ小文字化する
+    file_type = _FILE_TYPES.get(suffix)
+    if file_type is None and suffix:
+        file_type = _FILE_TYPES.get(suffix.lower())
+    return file_type
 
 
 def extract_text(file_path: Path) -> ExtractedContent:
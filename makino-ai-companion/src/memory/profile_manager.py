@@ -7,12 +7,95 @@
 import json
 import logging
 import sqlite3
+import time
 from typing import Optional
 
 from src.database.operations import get_or_create_profile
 
 logger = logging.getLogger(__name__)
 
+# プロファイル文脈のキャッシュ有効期間（秒）。更新は週次バッチなので短めで十分
+PROFILE_CACHE_TTL = 60.0
+# キャッシュに保持するユーザー数の上限
+PROFILE_CACHE_MAX_SIZE = 1024
+
+
+class ProfileContextCache:
+    """load_profile_context の結果を user_id ごとに一定時間保持するキャッシュ。
+
+    チャットの毎ターンでプロファイルをDBから読み直さないために使う。
+    週次バッチ（scripts/batch_analyze.py）は別プロセスで動くため、バッチによる
+    プロファイル更新はキャッシュの有効期間（既定60秒）が切れた後に反映される。
+    APIサーバーと同じプロセスで更新する処理は invalidate() で即座に破棄できる。
+    """
+
+    def __init__(
+        self,
+        ttl: float = PROFILE_CACHE_TTL,
+        max_size: int = PROFILE_CACHE_MAX_SIZE,
+    ) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: dict[str, tuple[float, Optional[str]]] = {}
+
+    def get(self, user_id: str) -> tuple[bool, Optional[str]]:
+        """キャッシュを引く。
+
+        Args:
+            user_id: ユーザーID
+
+        Returns:
+            (ヒットしたか, プロンプト注入用テキスト)。テキスト自体が None の場合もある。
+        """
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return False, None
+        expires_at, context = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(user_id, None)
+            return False, None
+        return True, context
+
+    def set(self, user_id: str, context: Optional[str]) -> None:
+        """プロファイル文脈を保存する。
+
+        Args:
+            user_id: ユーザーID
+            context: load_profile_context の戻り値
+        """
+        now = time.monotonic()
+        if user_id not in self._entries and len(self._entries) >= self.max_size:
+            # 期限切れを掃除し、それでも満杯なら最も古く登録されたものを捨てる
+            for key in [k for k, (exp, _) in self._entries.items() if exp <= now]:
+                del self._entries[key]
+            if len(self._entries) >= self.max_size:
+                del self._entries[next(iter(self._entries))]
+        self._entries[user_id] = (now + self.ttl, context)
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """キャッシュを破棄する。
+
+        Args:
+            user_id: 対象ユーザー。None なら全件を破棄する
+        """
+        if user_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(user_id, None)
+
+
+# APIサーバーで共有するキャッシュ
+profile_cache = ProfileContextCache()
+
+
+def invalidate_profile_context(user_id: Optional[str] = None) -> None:
+    """同じプロセス内でプロファイルを更新した後に共有キャッシュを破棄する。
+
+    Args:
+        user_id: 対象ユーザー。None なら全件を破棄する
+    """
+    profile_cache.invalidate(user_id)
+
 
 def load_profile_context(
     conn: sqlite3.Connection,
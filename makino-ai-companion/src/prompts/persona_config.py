@@ -11,6 +11,11 @@ from typing import Optional
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # libyaml なしでビルドされた PyYAML
+    from yaml import SafeLoader
+
 logger = logging.getLogger(__name__)
 
 
@@ -88,7 +93,7 @@ def load_persona_config(config_path: Optional[str | Path] = None) -> PersonaConf
         return PersonaConfig()
 
     with open(config_path, encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+        data = yaml.load(f, Loader=SafeLoader)
 
     persona_data = data.get("persona", {})
 
@@ -0,0 +1,151 @@
+"""意味的回答キャッシュのテスト。"""
+
+from dataclasses import dataclass
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+np = pytest.importorskip("numpy", reason="numpy が未インストール")
+
+from src.chat import answer_cache
+from src.chat.answer_cache import SemanticAnswerCache
+from src.chat.rag import KnowledgeChunk, SearchResult
+
+
+@dataclass
+class _Response:
+    """ChatResponse の代わり（engine は anthropic に依存するため読み込まない）。"""
+
+    answer: str
+    tokens_used: int
+    should_escalate: bool = False
+
+
+def _vec(*values: float) -> "np.ndarray":
+    """正規化済みベクトルを作る。"""
+    v = np.array(values, dtype=np.float32)
+    return v / np.linalg.norm(v)
+
+
+def _response(answer: str) -> _Response:
+    return _Response(answer=answer, tokens_used=120)
+
+
+class TestSemanticAnswerCache:
+    """SemanticAnswerCache のテスト。"""
+
+    def test_hit_similar_question(self) -> None:
+        """近い質問には前回の回答をトークン0で返すこと。"""
+        cache = SemanticAnswerCache(threshold=0.9)
+        cache.add(_vec(1, 0, 0), 1, _response("回答A"))
+        cache.add(_vec(0, 1, 0), 1, _response("回答B"))
+
+        hit = cache.lookup(_vec(1, 0.1, 0), 1)
+        assert hit is not None
+        assert hit.answer == "回答A"
+        assert hit.tokens_used == 0
+
+    def test_miss_below_threshold_or_other_pattern(self) -> None:
+        """類似度が閾値未満、またはパターンが異なればヒットしないこと。"""
+        cache = SemanticAnswerCache(threshold=0.9)
+        cache.add(_vec(1, 0, 0), 1, _response("回答A"))
+
+        assert cache.lookup(_vec(1, 1, 0), 1) is None
+        assert cache.lookup(_vec(1, 0, 0), 2) is None
+
+    def test_expired_and_max_entries(self) -> None:
+        """期限切れはヒットせず、上限を超えると古いものから捨てること。"""
+        cache = SemanticAnswerCache(ttl_seconds=0)
+        cache.add(_vec(1, 0, 0), 1, _response("回答A"))
+        assert cache.lookup(_vec(1, 0, 0), 1) is None
+
+        cache = SemanticAnswerCache(max_entries=1)
+        cache.add(_vec(1, 0, 0), 1, _response("回答A"))
+        cache.add(_vec(0, 1, 0), 1, _response("回答B"))
+        assert cache.lookup(_vec(1, 0, 0), 1) is None
+        assert cache.lookup(_vec(0, 1, 0), 1).answer == "回答B"
+
+    def test_expired_best_match_does_not_hide_valid_one(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """期限切れの最類似行があっても、閾値以上の有効な行がヒットすること。"""
+        now = [0.0]
+        monkeypatch.setattr(
+            answer_cache, "time", SimpleNamespace(monotonic=lambda: now[0])
+        )
+        cache = SemanticAnswerCache(threshold=0.9, ttl_seconds=10)
+        cache.add(_vec(1, 0, 0), 1, _response("回答A"))
+        now[0] = 5.0
+        cache.add(_vec(1, 0.2, 0), 1, _response("回答B"))
+
+        now[0] = 12.0
+        hit = cache.lookup(_vec(1, 0, 0), 1)
+        assert hit is not None
+        assert hit.answer == "回答B"
+
+    def test_escalated_response_not_stored(self) -> None:
+        """エスカレーション応答は保存されないこと。"""
+        cache = SemanticAnswerCache()
+        cache.add(
+            _vec(1, 0, 0),
+            1,
+            _Response(answer="確認します", tokens_used=0, should_escalate=True),
+        )
+        assert cache.lookup(_vec(1, 0, 0), 1) is None
+
+
+class TestChatEngineAnswerCache:
+    """ChatEngine での回答キャッシュ利用のテスト。"""
+
+    @pytest.fixture
+    def engine(self):
+        """回答キャッシュ有効・全質問が同じ埋め込みになるエンジン。"""
+        pytest.importorskip("anthropic", reason="anthropic が未インストール")
+        from src.chat.engine import ChatEngine
+
+        engine = ChatEngine.__new__(ChatEngine)
+        engine.answer_cache = SemanticAnswerCache(threshold=0.9)
+        engine._base_prompts = {1: "ベースプロンプト"}
+        engine.rag = MagicMock()
+        engine.rag.embedding.encode_query.return_value = _vec(1, 0, 0)
+        chunk = KnowledgeChunk(
+            content="赤字の会社こそ保障が必要です。",
+            source_file="qa/sample.md",
+            category="法人保険",
+            metadata={},
+            pattern_ids=[1],
+        )
+        engine.rag.search.return_value = [SearchResult(chunk=chunk, score=0.9)]
+        engine.rag.format_context.return_value = "参照ナレッジ"
+        engine.rag.get_sources.return_value = ["qa/sample.md"]
+        return engine
+
+    def test_cached_answer_does_not_suppress_escalation(self, engine) -> None:
+        """キャッシュに近い回答があっても、強制エスカレーションの質問は確認に回ること。"""
+        from src.chat.engine import ChatResponse
+
+        engine.answer_cache.add(
+            _vec(1, 0, 0),
+            1,
+            ChatResponse(
+                answer="前回の回答",
+                sources=["qa/sample.md"],
+                confidence=0.9,
+                should_escalate=False,
+                escalation_reason="",
+                tokens_used=100,
+                category="法人保険",
+            ),
+        )
+
+        hit = engine._prepare("法人保険の提案方法は？", 1, None, None)
+        assert isinstance(hit, ChatResponse)
+        assert hit.answer == "前回の回答"
+        assert hit.tokens_used == 0
+
+        escalated = engine._prepare(
+            "法人保険のコンプライアンス上の注意点は？", 1, None, None
+        )
+        assert escalated.should_escalate
+        assert "コンプライアンス" in escalated.escalation_reason
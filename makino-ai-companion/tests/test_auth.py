@@ -46,6 +46,18 @@ class TestJWT:
         result = decode_jwt_token("")
         assert result is None
 
+    def test_decode_cached(self) -> None:
+        """同じトークンは署名検証を繰り返さず、呼び出し側の変更も共有されないこと。"""
+        token = create_jwt_token({"sub": "cache-1", "email": "cache@example.com"})
+        first = decode_jwt_token(token)
+        first["role"] = "admin"
+
+        with patch("src.auth.oauth.jwt.decode") as mock_decode:
+            second = decode_jwt_token(token)
+        mock_decode.assert_not_called()
+        assert second["email"] == "cache@example.com"
+        assert "role" not in second
+
     def test_token_contains_expiry(self) -> None:
         """トークンにexp/iatが含まれること。"""
         token = create_jwt_token({"sub": "test", "email": "a@b.com"})
@@ -165,7 +177,7 @@ class TestAuthDependencies:
         request = MagicMock()
         request.cookies = {COOKIE_NAME: token}
 
-        user = await require_admin(request)
+        user = await require_admin(await get_current_user(request))
         assert user.is_admin
 
     @pytest.mark.asyncio
@@ -180,5 +192,5 @@ class TestAuthDependencies:
         request.cookies = {COOKIE_NAME: token}
 
         with pytest.raises(Exception) as exc_info:
-            await require_admin(request)
+            await require_admin(await get_current_user(request))
         assert exc_info.value.status_code == 403
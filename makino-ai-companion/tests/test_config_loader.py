@@ -0,0 +1,74 @@
+"""設定ファイル読み込みのテスト。"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from src.config_loader import load_config, load_yaml_cached
+
+
+@pytest.fixture
+def settings_path(tmp_path: Path) -> Path:
+    """テスト用の settings.yaml を作成する。"""
+    path = tmp_path / "settings.yaml"
+    path.write_text(
+        "claude:\n"
+        "  api_key: ${TEST_CONFIG_API_KEY}\n"
+        "  model: test-model\n"
+        "admins:\n"
+        "  - ${TEST_CONFIG_UNDEFINED}\n"
+        "server:\n"
+        "  port: 8000\n",
+        encoding="utf-8",
+    )
+    return path
+
+
+class TestLoadConfig:
+    """load_config のテスト。"""
+
+    def test_env_expansion(
+        self, settings_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """環境変数が展開され、未定義の参照はそのまま残ること。"""
+        monkeypatch.setenv("TEST_CONFIG_API_KEY", "sk-test: #1")
+        config = load_config(settings_path)
+        assert config["claude"]["api_key"] == "sk-test: #1"
+        assert config["admins"] == ["${TEST_CONFIG_UNDEFINED}"]
+        assert config["server"]["port"] == 8000
+
+    def test_cache_has_no_secrets(
+        self, settings_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """キャッシュには展開前の値だけが保存されること。"""
+        monkeypatch.setenv("TEST_CONFIG_API_KEY", "secret-value")
+        load_config(settings_path)
+        cache = settings_path.with_name("settings.yaml.pkl")
+        assert cache.exists()
+        assert b"secret-value" not in cache.read_bytes()
+
+
+class TestLoadYamlCached:
+    """load_yaml_cached のテスト。"""
+
+    def test_cache_hit(self, settings_path: Path) -> None:
+        """ファイルが変わらなければキャッシュから読むこと。"""
+        first = load_yaml_cached(settings_path)
+        cache = settings_path.with_name("settings.yaml.pkl")
+        mtime = cache.stat().st_mtime_ns
+        assert load_yaml_cached(settings_path) == first
+        assert cache.stat().st_mtime_ns == mtime
+
+    def test_reparse_on_change(self, settings_path: Path) -> None:
+        """ファイルが更新されたら再パースすること。"""
+        load_yaml_cached(settings_path)
+        settings_path.write_text("server:\n  port: 9000\n", encoding="utf-8")
+        st = settings_path.stat()
+        os.utime(settings_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert load_yaml_cached(settings_path) == {"server": {"port": 9000}}
+
+    def test_broken_cache(self, settings_path: Path) -> None:
+        """壊れたキャッシュは無視して読み直すこと。"""
+        settings_path.with_name("settings.yaml.pkl").write_bytes(b"broken")
+        assert load_yaml_cached(settings_path)["server"]["port"] == 8000
@@ -1,20 +1,24 @@
 """データベースのテスト。"""
 
+import csv
 import sqlite3
 from pathlib import Path
 
 import pytest
 
-from src.database.models import DB_SCHEMA, init_db, get_connection
+from src.database.models import DB_SCHEMA, ConnectionPool, init_db, get_connection
 from src.database.operations import (
     save_conversation,
     save_feedback,
+    export_to_csv,
     get_conversation_history,
     calculate_metrics,
+    get_pattern_breakdown,
     save_interaction_log,
     get_or_create_profile,
     update_profile,
 )
+from src.memory.profile_manager import ProfileContextCache, load_profile_context
 
 
 @pytest.fixture
@@ -47,6 +51,46 @@ class TestInitDb:
         mode = cursor.fetchone()[0]
         assert mode == "wal"
 
+    def test_get_connection_pragmas(self, db_conn: sqlite3.Connection, tmp_path: Path) -> None:
+        """既存DBへの接続でも読み取り向けのPRAGMAが設定されること。"""
+        conn = get_connection(tmp_path / "test.db")
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+        conn.close()
+
+
+class TestConnectionPool:
+    """接続プールのテスト。"""
+
+    def test_acquire_distinct_connections(self, db_conn: sqlite3.Connection, tmp_path: Path) -> None:
+        """同時に借りた接続は別物で、返却後に再利用されること。"""
+        pool = ConnectionPool(tmp_path / "test.db", size=2)
+        with pool.acquire() as c1, pool.acquire() as c2:
+            assert c1 is not c2
+            conv_id = save_conversation(c1, "s", "u", "pattern_1", "Q", "A", [], 0.8)
+            assert get_conversation_history(c2, "s")[0]["question"] == "Q"
+        with pool.acquire() as c3:
+            assert c3 in (c1, c2)
+            assert c3.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+        assert conv_id > 0
+        pool.close()
+
+    def test_rollback_on_error(self, db_conn: sqlite3.Connection, tmp_path: Path) -> None:
+        """例外で抜けた接続の未確定の書き込みは巻き戻されること。"""
+        pool = ConnectionPool(tmp_path / "test.db", size=1)
+        with pytest.raises(RuntimeError), pool.acquire() as conn:
+            conn.execute(
+                "INSERT INTO conversations (session_id, user_id, bot_pattern, question, answer) "
+                "VALUES ('s', 'u', 'pattern_1', 'Q', 'A')"
+            )
+            raise RuntimeError
+        with pool.acquire() as conn:
+            assert not conn.in_transaction
+            assert conn.execute("SELECT COUNT(*) FROM conversations").fetchone()[0] == 0
+        pool.close()
+
 
 class TestConversations:
     """会話保存・取得のテスト。"""
@@ -152,6 +196,53 @@ class TestMetrics:
         assert metrics["feedback_count"] == 4
         assert metrics["user_satisfaction"] == 0.75
 
+    def test_pattern_breakdown(self, db_conn: sqlite3.Connection) -> None:
+        """パターン別に件数・確信度・エスカレーション数が集計されること。"""
+        save_conversation(db_conn, "s1", "u1", "pattern_1", "Q1", "A1", [], 0.8)
+        save_conversation(db_conn, "s1", "u1", "pattern_1", "Q2", "A2", [], 0.4, escalated=True)
+        save_conversation(db_conn, "s2", "u2", "pattern_2", "Q3", "A3", [], 0.9)
+        breakdown = get_pattern_breakdown(db_conn)
+        assert breakdown["pattern_1"]["count"] == 2
+        assert breakdown["pattern_1"]["avg_confidence"] == pytest.approx(0.6)
+        assert breakdown["pattern_1"]["escalated"] == 1
+        assert breakdown["pattern_2"]["count"] == 1
+
+    def test_metrics_uses_covering_index(self, db_conn: sqlite3.Connection) -> None:
+        """期間指定のKPI集計が複合索引だけで処理されること。"""
+        plan = db_conn.execute(
+            """EXPLAIN QUERY PLAN
+               SELECT COUNT(*), AVG(confidence), SUM(escalated)
+               FROM conversations c WHERE 1=1 AND c.timestamp >= ? AND c.timestamp <= ?""",
+            ("2025-01-01", "2025-12-31"),
+        ).fetchall()
+        details = " ".join(row["detail"] for row in plan)
+        assert "COVERING INDEX idx_conversations_timestamp_pattern" in details
+
+
+class TestExport:
+    """CSVエクスポートのテスト。"""
+
+    def test_export_to_csv(self, db_conn: sqlite3.Connection, tmp_path: Path, monkeypatch) -> None:
+        """バッチ境界をまたいでも全件がヘッダー付きで書き出されること。"""
+        monkeypatch.setattr("src.database.operations.EXPORT_BATCH_SIZE", 2)
+        for i in range(5):
+            save_conversation(db_conn, "s", "u", "pattern_1", f"Q{i}", f"A{i}", [], 0.8)
+        output = tmp_path / "exports" / "log.csv"
+
+        assert export_to_csv(db_conn, output) == 5
+
+        with open(output, encoding="utf-8", newline="") as f:
+            rows = list(csv.reader(f))
+        assert rows[0][:2] == ["id", "timestamp"]
+        assert rows[0][-2:] == ["user_rating", "feedback_comment"]
+        assert [r[rows[0].index("question")] for r in rows[1:]] == [f"Q{i}" for i in range(5)]
+
+    def test_export_empty(self, db_conn: sqlite3.Connection, tmp_path: Path) -> None:
+        """対象がなければファイルを作らず0を返すこと。"""
+        output = tmp_path / "log.csv"
+        assert export_to_csv(db_conn, output) == 0
+        assert not output.exists()
+
 
 class TestInteractionLogs:
     """操作ログのテスト。"""
@@ -213,3 +304,34 @@ class TestUserProfiles:
         )
         row = cursor.fetchone()
         assert '"level"' in row[0]
+
+
+class TestProfileContextCache:
+    """プロファイル文脈キャッシュのテスト。"""
+
+    def test_cache_until_invalidated(self, db_conn: sqlite3.Connection) -> None:
+        """更新後も破棄するまでは前回の文脈を返すこと。"""
+        cache = ProfileContextCache(ttl=60)
+        get_or_create_profile(db_conn, "user1")
+        update_profile(db_conn, "user1", '{"understanding_level": {"法人保険": "中級"}}')
+        cache.set("user1", load_profile_context(db_conn, "user1"))
+
+        update_profile(db_conn, "user1", "{}")
+        hit, context = cache.get("user1")
+        assert hit
+        assert "法人保険" in context
+
+        cache.invalidate("user1")
+        assert cache.get("user1") == (False, None)
+
+    def test_expired_and_max_size(self) -> None:
+        """期限切れはヒットせず、上限を超えると古いものから捨てること。"""
+        cache = ProfileContextCache(ttl=0)
+        cache.set("u1", None)
+        assert cache.get("u1") == (False, None)
+
+        cache = ProfileContextCache(ttl=60, max_size=2)
+        for uid in ("u1", "u2", "u3"):
+            cache.set(uid, uid)
+        assert cache.get("u1") == (False, None)
+        assert cache.get("u3") == (True, "u3")
@@ -193,6 +193,18 @@ class TestKnowledgeLoader:
         assert len(unknown_chunks) > 0
         assert unknown_chunks[0].pattern_ids == [1, 2, 3, 4]
 
+    def test_split_by_sections(self, tmp_path: Path) -> None:
+        """h1〜h3 見出しの位置でセクション分割されること。"""
+        loader = KnowledgeLoader(tmp_path)
+        content = "前文\n# 見出し1\n本文1\n#### 小見出し\n本文2\n## 見出し2\n本文3"
+        assert loader._split_by_sections(content) == [
+            "前文",
+            "# 見出し1\n本文1\n#### 小見出し\n本文2",
+            "## 見出し2\n本文3",
+        ]
+        assert loader._split_by_sections("見出しのない本文\n続き") == ["見出しのない本文\n続き"]
+        assert loader._split_by_sections("\n \n") == []
+
 
 class TestSimpleRAG:
     """SimpleRAGのテスト。"""
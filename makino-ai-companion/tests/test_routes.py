@@ -0,0 +1,257 @@
+"""APIルーティングのテスト。"""
+
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+pytest.importorskip("fastapi", reason="fastapi が未インストール")
+pytest.importorskip("httpx", reason="httpx が未インストール（TestClient に必要）")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api import routes
+from src.auth.dependencies import AuthUser, get_current_user
+from src.chat.engine import ChatResponse
+from src.database.models import ConnectionPool, init_db
+
+USER = AuthUser({"sub": "u-1", "email": "user@example.com", "role": "user"})
+ADMIN = AuthUser({"sub": "a-1", "email": "admin@example.com", "role": "admin"})
+GUIDE_BODY = {"pattern": 1, "category": "法人保険"}
+CHAT_REQUEST = {
+    "question": "契約内容の確認をお願いします",
+    "pattern": 1,
+    "interaction": {"input_method": "guided_nav", "guide_category": "法人保険"},
+}
+
+
+def _message(text: str) -> SimpleNamespace:
+    """Claude API の応答（messages.create の戻り値）の代わり。"""
+    return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+
+@pytest.fixture
+def engine() -> MagicMock:
+    """Claude API を呼ばないエンジン。"""
+    engine = MagicMock()
+    engine.model = "test-model"
+    engine.async_client.messages.create = AsyncMock(
+        return_value=_message('["項目A", "項目B"]')
+    )
+    return engine
+
+
+@pytest.fixture
+def db_pool(tmp_path: Path):
+    """スキーマ作成済みのテスト用DBの接続プール。"""
+    db_path = tmp_path / "test.db"
+    init_db(db_path).close()
+    pool = ConnectionPool(db_path, size=2)
+    yield pool
+    pool.close()
+
+
+def _login(app: FastAPI, user: AuthUser) -> None:
+    """以降のリクエストを user としてログインした状態にする。"""
+    app.dependency_overrides[get_current_user] = lambda: user
+
+
+@pytest.fixture
+def notifier() -> MagicMock:
+    """エスカレーション通知サービスの代わり。"""
+    return MagicMock()
+
+
+@pytest.fixture
+def app(engine: MagicMock, db_pool: ConnectionPool, notifier: MagicMock) -> FastAPI:
+    """一般ユーザーでログイン済みのアプリ。"""
+    app = FastAPI()
+    app.include_router(routes.create_routes(engine, db_pool, notifier))
+    _login(app, USER)
+    return app
+
+
+@pytest.fixture
+def client(app: FastAPI) -> TestClient:
+    return TestClient(app)
+
+
+def _set_random(monkeypatch: pytest.MonkeyPatch, value: float) -> None:
+    """キャッシュ済みの候補を生成し直すかの乱数を固定する。"""
+    monkeypatch.setattr(routes, "random", SimpleNamespace(random=lambda: value))
+
+
+class TestGuideSuggestions:
+    """質問ナビのサブトピック生成とキャッシュのテスト。"""
+
+    def test_cache_hit(
+        self, client: TestClient, engine: MagicMock, monkeypatch
+    ) -> None:
+        """同じ (パターン, カテゴリ) の2回目は Claude API を呼ばずに返すこと。"""
+        _set_random(monkeypatch, 1.0)
+        first = client.post("/api/guide/suggestions", json=GUIDE_BODY)
+        second = client.post("/api/guide/suggestions", json=GUIDE_BODY)
+
+        assert first.json() == {"suggestions": ["項目A", "項目B"]}
+        assert second.json() == first.json()
+        assert engine.async_client.messages.create.await_count == 1
+
+    def test_stale_fallback_when_generation_fails(
+        self, client: TestClient, engine: MagicMock, monkeypatch
+    ) -> None:
+        """生成し直しが失敗したら、以前の候補を返すこと。"""
+        client.post("/api/guide/suggestions", json=GUIDE_BODY)
+
+        # 確率的な生成し直しを起こし、その生成を失敗させる
+        _set_random(monkeypatch, 0.0)
+        engine.async_client.messages.create.side_effect = RuntimeError("API error")
+        response = client.post("/api/guide/suggestions", json=GUIDE_BODY)
+
+        assert response.status_code == 200
+        assert response.json() == {"suggestions": ["項目A", "項目B"]}
+        assert engine.async_client.messages.create.await_count == 2
+
+    def test_failure_without_cache_returns_empty(
+        self, client: TestClient, engine: MagicMock
+    ) -> None:
+        """候補がなく生成も失敗したら空リストを返すこと。"""
+        engine.async_client.messages.create.side_effect = RuntimeError("API error")
+        response = client.post("/api/guide/suggestions", json=GUIDE_BODY)
+        assert response.json() == {"suggestions": []}
+
+    def test_clear_cache_rejects_non_admin(
+        self, app: FastAPI, client: TestClient, engine: MagicMock, monkeypatch
+    ) -> None:
+        """管理者以外のキャッシュ破棄は 403 になり、キャッシュは残ること。"""
+        _set_random(monkeypatch, 1.0)
+        client.post("/api/guide/suggestions", json=GUIDE_BODY)
+
+        assert client.delete("/api/guide/suggestions/cache").status_code == 403
+        app.dependency_overrides.clear()
+        assert client.delete("/api/guide/suggestions/cache").status_code == 401
+
+        _login(app, USER)
+        client.post("/api/guide/suggestions", json=GUIDE_BODY)
+        assert engine.async_client.messages.create.await_count == 1
+
+    def test_clear_cache_as_admin(
+        self, app: FastAPI, client: TestClient, engine: MagicMock, monkeypatch
+    ) -> None:
+        """管理者が破棄すると、次の要求で生成し直すこと。"""
+        _set_random(monkeypatch, 1.0)
+        client.post("/api/guide/suggestions", json=GUIDE_BODY)
+
+        _login(app, ADMIN)
+        response = client.delete("/api/guide/suggestions/cache")
+        assert response.json() == {"status": "ok", "cleared": 1}
+
+        client.post("/api/guide/suggestions", json=GUIDE_BODY)
+        assert engine.async_client.messages.create.await_count == 2
+
+    def test_expired_entry_regenerated_and_kept_as_fallback(
+        self, client: TestClient, engine: MagicMock, monkeypatch
+    ) -> None:
+        """24時間を過ぎた候補は生成し直し、生成に失敗したら期限切れの候補を返すこと。"""
+        now = [1000.0]
+        monkeypatch.setattr(routes, "time", SimpleNamespace(monotonic=lambda: now[0]))
+        _set_random(monkeypatch, 1.0)
+        client.post("/api/guide/suggestions", json=GUIDE_BODY)
+
+        # 期限の直前まではキャッシュから返す
+        now[0] += routes.GUIDE_SUGGESTIONS_CACHE_TTL - 1
+        client.post("/api/guide/suggestions", json=GUIDE_BODY)
+        assert engine.async_client.messages.create.await_count == 1
+
+        # 期限を過ぎたら生成し直す。失敗しても期限切れの候補を返す
+        now[0] += 2
+        engine.async_client.messages.create.side_effect = RuntimeError("API error")
+        response = client.post("/api/guide/suggestions", json=GUIDE_BODY)
+        assert engine.async_client.messages.create.await_count == 2
+        assert response.json() == {"suggestions": ["項目A", "項目B"]}
+
+        # 生成できれば新しい候補で置き換える
+        engine.async_client.messages.create.side_effect = None
+        engine.async_client.messages.create.return_value = _message('["項目C"]')
+        response = client.post("/api/guide/suggestions", json=GUIDE_BODY)
+        assert response.json() == {"suggestions": ["項目C"]}
+        client.post("/api/guide/suggestions", json=GUIDE_BODY)
+        assert engine.async_client.messages.create.await_count == 3
+
+
+class TestChat:
+    """チャットエンドポイントのテスト。"""
+
+    @pytest.fixture
+    def escalating_engine(self, engine: MagicMock) -> MagicMock:
+        """エスカレーション対象の回答を返すエンジン。"""
+        engine.generate_session_id.return_value = "session-1"
+        engine.achat = AsyncMock(
+            return_value=ChatResponse(
+                answer="担当者に確認します",
+                sources=[],
+                confidence=0.2,
+                should_escalate=True,
+                escalation_reason="強制エスカレーションカテゴリ: 個別顧客の契約内容",
+                tokens_used=0,
+                category="その他",
+            )
+        )
+        return engine
+
+    def _rows(self, db_pool: ConnectionPool, conv_id: int) -> tuple[list, list]:
+        with db_pool.acquire() as conn:
+            logs = conn.execute(
+                "SELECT user_id, input_method, guide_category FROM interaction_logs"
+                " WHERE conversation_id = ?",
+                (conv_id,),
+            ).fetchall()
+            escalations = conn.execute(
+                "SELECT reason FROM escalations WHERE conversation_id = ?", (conv_id,)
+            ).fetchall()
+        return [tuple(r) for r in logs], [tuple(r) for r in escalations]
+
+    def test_followups_saved_and_notified(
+        self,
+        client: TestClient,
+        escalating_engine: MagicMock,
+        db_pool: ConnectionPool,
+        notifier: MagicMock,
+    ) -> None:
+        """応答の送信後に操作ログ・エスカレーションが保存され、通知されること。"""
+        response = client.post("/api/chat", json=CHAT_REQUEST)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["escalated"] is True
+        assert data["session_id"] == "session-1"
+
+        logs, escalations = self._rows(db_pool, data["conversation_id"])
+        assert logs == [("user@example.com", "guided_nav", "法人保険")]
+        assert escalations == [("強制エスカレーションカテゴリ: 個別顧客の契約内容",)]
+
+        notifier.notify.assert_called_once()
+        event = notifier.notify.call_args.args[0]
+        assert event.conversation_id == data["conversation_id"]
+        assert event.session_id == "session-1"
+        assert event.question == CHAT_REQUEST["question"]
+
+    def test_notifier_failure_is_only_logged(
+        self,
+        client: TestClient,
+        escalating_engine: MagicMock,
+        db_pool: ConnectionPool,
+        notifier: MagicMock,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        """通知に失敗しても応答と保存には影響せず、警告ログだけが出ること。"""
+        notifier.notify.side_effect = RuntimeError("SMTP down")
+
+        response = client.post("/api/chat", json=CHAT_REQUEST)
+
+        assert response.status_code == 200
+        logs, escalations = self._rows(db_pool, response.json()["conversation_id"])
+        assert len(logs) == 1
+        assert len(escalations) == 1
+        assert "エスカレーション通知失敗: SMTP down" in caplog.text